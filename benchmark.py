@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks the parsing and scoring stages over the tournaments in data/.
+
+Usage: python benchmark.py [--data data] [--synthetic PLAYERS] [--repeat 3] [--threshold 0.25] [--update-baseline]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from show_score import (
+    add_hole_status,
+    clean_content,
+    course_info_table,
+    get_score_midround,
+    map_tournament_file,
+    parse_all_player_data,
+    parse_data,
+)
+from synthetic_tournament import write_tournament
+
+
+BASELINE_FILE = "benchmark_baseline.json"
+STAGES = ["parse_data", "parse_mapped", "parse_all_player_data", "add_hole_status", "get_score_midround", "course_info"]
+
+
+def tournament_files(data_folder):
+    return [
+        os.path.join(data_folder, file)
+        for file in sorted(os.listdir(data_folder)) if file.endswith(".csv")
+    ]
+
+def parse_mapped(file_path):
+    # The app's read path: the file memory-mapped and its lines indexed by
+    # byte offset (see load_parsed_tournament), instead of readlines()
+    with map_tournament_file(file_path) as content:
+        return parse_data(content)
+
+def stage_calls(content, file_path):
+    # One zero-argument callable per stage, each doing that stage's full work
+    # for one tournament (every round, every hole where it applies)
+    course_df, player_dfs, _, _ = parse_data(content)
+    cleaned_content = clean_content(content)
+    averages = [get_score_midround(player_df.copy(), 18, course_df)[1] for player_df in player_dfs]
+
+    def score_every_checkpoint():
+        for player_df in player_dfs:
+            for hole_num in range(len(course_df) + 1):
+                get_score_midround(player_df, hole_num, course_df)
+
+    return {
+        "parse_data": lambda: parse_data(content),
+        "parse_mapped": lambda: parse_mapped(file_path),
+        "parse_all_player_data": lambda: parse_all_player_data(cleaned_content),
+        "add_hole_status": lambda: [add_hole_status(player_df.copy(), course_df) for player_df in player_dfs],
+        "get_score_midround": score_every_checkpoint,
+        "course_info": lambda: [course_info_table(course_df, hole_diff_averages) for hole_diff_averages in averages],
+    }
+
+def time_call(call, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def peak_memory(call):
+    tracemalloc.start()
+    try:
+        call()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def run_benchmarks(files, repeat=3):
+    results = {stage: {"seconds": 0.0, "peak_bytes": 0} for stage in STAGES}
+    total_lines, total_players = 0, 0
+
+    for file_path in files:
+        with open(file_path, "r", encoding="utf-8") as f:
+            content = f.readlines()
+        _, player_dfs, _, _ = parse_data(content)
+        total_lines += len(content)
+        total_players += sum(len(player_df) for player_df in player_dfs)
+
+        for stage, call in stage_calls(content, file_path).items():
+            results[stage]["seconds"] += time_call(call, repeat)
+            results[stage]["peak_bytes"] = max(results[stage]["peak_bytes"], peak_memory(call))
+
+    for stage in STAGES:
+        seconds = results[stage]["seconds"]
+        results[stage]["lines_per_s"] = total_lines / seconds if seconds else float("inf")
+        results[stage]["players_per_s"] = total_players / seconds if seconds else float("inf")
+    return {"files": len(files), "lines": total_lines, "players": total_players, "stages": results}
+
+def compare_to_baseline(results, baseline, threshold):
+    if (baseline.get("files"), baseline.get("lines")) != (results["files"], results["lines"]):
+        print("Baseline was recorded on a different input set; not comparing")
+        return []
+    regressions = []
+    for stage, stats in results["stages"].items():
+        if stage not in baseline.get("stages", {}):
+            continue
+        before = baseline["stages"][stage]["seconds"]
+        if before and stats["seconds"] > before * (1 + threshold):
+            regressions.append((stage, before, stats["seconds"]))
+    return regressions
+
+def print_report(results):
+    print(f"{results['files']} files, {results['lines']} lines, {results['players']} player rounds")
+    print(f"{'stage':<24}{'seconds':>10}{'lines/s':>14}{'players/s':>14}{'peak MiB':>10}")
+    for stage, stats in results["stages"].items():
+        print(
+            f"{stage:<24}{stats['seconds']:>10.4f}{stats['lines_per_s']:>14.0f}"
+            f"{stats['players_per_s']:>14.0f}{stats['peak_bytes'] / 2**20:>10.2f}"
+        )
+
+
+# %%
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark parsing and scoring over the tournament corpus.")
+    parser.add_argument("--data", default="data", help="folder with the tournament exports")
+    parser.add_argument("--synthetic", type=int, nargs="*", default=[], metavar="PLAYERS",
+                        help="also benchmark generated tournaments with these field sizes")
+    parser.add_argument("--synthetic-rounds", type=int, default=3, help="rounds per generated tournament")
+    parser.add_argument("--repeat", type=int, default=3, help="timing repeats per stage (best is kept)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown vs. the baseline (0.25 = 25%%)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as synthetic_folder:
+        files = tournament_files(args.data)
+        for n_players in args.synthetic:
+            files.append(write_tournament(
+                os.path.join(synthetic_folder, f"synthetic_{n_players}.csv"),
+                n_players=n_players, n_rounds=args.synthetic_rounds,
+            ))
+        results = run_benchmarks(files, args.repeat)
+    print_report(results)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        sys.exit(0)
+
+    try:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        sys.exit(0)
+
+    regressions = compare_to_baseline(results, baseline, args.threshold)
+    for stage, before, after in regressions:
+        print(f"REGRESSION {stage}: {before:.4f}s -> {after:.4f}s")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Loads every tournament in data/ into a SQLite warehouse for cross-event queries.
+
+Usage: python build_warehouse.py [--data data] [--db tournaments.sqlite] [--force]
+
+Example: all aces on hole 7 at Búřov
+
+    SELECT t.event_date, l.name AS layout, p.name, s.round
+    FROM courses c
+    JOIN layouts l USING (course_id)
+    JOIN round_layouts r USING (layout_id)
+    JOIN hole_scores s ON s.tournament_id = r.tournament_id AND s.round = r.round
+    JOIN tournaments t ON t.tournament_id = s.tournament_id
+    JOIN players p USING (player_id)
+    WHERE c.name = 'Búřov DiscGolfPark' AND s.hole = 7 AND s.strokes = 1;
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from export_standings import file_hash
+from show_score import (
+    CACHE_SCHEMA_VERSION,
+    compile_tournament,
+    load_catalog,
+    load_parsed_tournament,
+    load_player_index,
+    map_tournament_file,
+    normalize_names,
+    parse_round_courses,
+    tournament_date,
+)
+
+
+WAREHOUSE_FILE = "tournaments.sqlite"
+WAREHOUSE_SCHEMA_VERSION = 2  # Stored as PRAGMA user_version; a mismatch rebuilds the database
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS courses (
+    course_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE  -- course line of a round header, e.g. Búřov DiscGolfPark
+);
+CREATE TABLE IF NOT EXISTS layouts (
+    layout_id INTEGER PRIMARY KEY,
+    course_id INTEGER NOT NULL REFERENCES courses,
+    name TEXT NOT NULL,  -- layout line of the first round played on it
+    holes TEXT NOT NULL,  -- JSON [[length, par], ...]; a changed hole is a new layout
+    UNIQUE (course_id, holes)
+);
+CREATE TABLE IF NOT EXISTS holes (
+    layout_id INTEGER NOT NULL REFERENCES layouts,
+    hole INTEGER NOT NULL,
+    length_m INTEGER,
+    par INTEGER,
+    PRIMARY KEY (layout_id, hole)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tournaments (
+    tournament_id INTEGER PRIMARY KEY,
+    file TEXT NOT NULL UNIQUE,
+    hash TEXT NOT NULL,
+    schema_version INTEGER NOT NULL,
+    name TEXT,
+    event_date TEXT NOT NULL,
+    dates TEXT,
+    division TEXT,
+    tier TEXT,
+    rounds INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS round_layouts (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments,
+    round INTEGER NOT NULL,
+    layout_id INTEGER NOT NULL REFERENCES layouts,
+    PRIMARY KEY (tournament_id, round)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS players (
+    player_id INTEGER PRIMARY KEY,  -- id of the cross-tournament player index
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rounds (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments,
+    round INTEGER NOT NULL,
+    entry INTEGER NOT NULL,  -- player id within the tournament
+    player_id INTEGER NOT NULL REFERENCES players,
+    name TEXT NOT NULL,
+    place TEXT,
+    total INTEGER,
+    round_score INTEGER,
+    rating INTEGER,
+    dnf INTEGER NOT NULL,
+    PRIMARY KEY (tournament_id, round, entry)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS hole_scores (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments,
+    round INTEGER NOT NULL,
+    entry INTEGER NOT NULL,
+    hole INTEGER NOT NULL,
+    player_id INTEGER NOT NULL REFERENCES players,
+    strokes INTEGER NOT NULL,
+    par_diff INTEGER,  -- against the par of the layout played in that round
+    PRIMARY KEY (tournament_id, round, entry, hole)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS tournaments_event_date ON tournaments (event_date);
+CREATE INDEX IF NOT EXISTS layouts_course ON layouts (course_id);
+CREATE INDEX IF NOT EXISTS round_layouts_layout ON round_layouts (layout_id, tournament_id, round);
+CREATE INDEX IF NOT EXISTS rounds_player ON rounds (player_id, tournament_id);
+CREATE INDEX IF NOT EXISTS hole_scores_player ON hole_scores (player_id, tournament_id);
+CREATE INDEX IF NOT EXISTS hole_scores_hole ON hole_scores (tournament_id, round, hole, strokes);
+"""
+
+CHILD_TABLES = ["round_layouts", "rounds", "hole_scores"]
+
+
+def connect(db_file):
+    conn = sqlite3.connect(db_file)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] != WAREHOUSE_SCHEMA_VERSION:
+        tables = [name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        with conn:
+            for table in tables:
+                conn.execute(f'DROP TABLE "{table}"')
+            conn.execute(f"PRAGMA user_version = {WAREHOUSE_SCHEMA_VERSION}")
+    conn.executescript(SCHEMA)
+    return conn
+
+def numeric_column(values):
+    # Score columns are strings ("E", "-3", "DNF", ""); None where not a number
+    numbers = pd.to_numeric(pd.Series(values, dtype=object).replace("E", "0"), errors="coerce")
+    return [None if np.isnan(number) else int(number) for number in numbers]
+
+def layout_id(conn, round_course):
+    # Courses are matched by name, layouts by course and hole table
+    conn.execute("INSERT INTO courses (name) VALUES (?) ON CONFLICT (name) DO NOTHING", (round_course["course"],))
+    course_id = conn.execute("SELECT course_id FROM courses WHERE name = ?", (round_course["course"],)).fetchone()[0]
+    course_df = round_course["course_df"]
+    lengths, pars = numeric_column(course_df["Length (m)"]), numeric_column(course_df["Par"])
+    holes = json.dumps(list(zip(lengths, pars)))
+    row = conn.execute("SELECT layout_id FROM layouts WHERE course_id = ? AND holes = ?", (course_id, holes)).fetchone()
+    if row is not None:
+        return row[0], pars
+    layout_id = conn.execute(
+        "INSERT INTO layouts (course_id, name, holes) VALUES (?, ?, ?) RETURNING layout_id",
+        (course_id, round_course["layout"], holes),
+    ).fetchone()[0]
+    conn.executemany(
+        "INSERT INTO holes VALUES (?, ?, ?, ?)",
+        zip([layout_id] * len(course_df), range(1, len(course_df) + 1), lengths, pars),
+    )
+    return layout_id, pars
+
+def ingest_tournament(conn, file_path, entry, fingerprint, key_to_id):
+    # Replaces everything stored for one tournament in a single transaction;
+    # the tournament keeps its id across updates
+    file = os.path.basename(file_path)
+    course_df, player_dfs, tournament_details, _ = load_parsed_tournament(file_path)
+    with map_tournament_file(file_path) as content:
+        round_courses = parse_round_courses(content)
+    # Rounds without a header of their own fall back to the event's last
+    # details line and the hole table of the first round
+    fallback = {"course": tournament_details[-1], "layout": tournament_details[-1], "course_df": course_df}
+    round_courses = (round_courses + [fallback] * len(player_dfs))[:len(player_dfs)]
+    tournament = compile_tournament(course_df, player_dfs)
+
+    with conn:
+        tournament_id = conn.execute(
+            """
+            INSERT INTO tournaments (file, hash, schema_version, name, event_date, dates, division, tier, rounds)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (file) DO UPDATE SET
+                hash = excluded.hash, schema_version = excluded.schema_version, name = excluded.name,
+                event_date = excluded.event_date, dates = excluded.dates, division = excluded.division,
+                tier = excluded.tier, rounds = excluded.rounds
+            RETURNING tournament_id
+            """,
+            (
+                file, fingerprint["hash"], fingerprint["schema"], entry.get("display_name"), tournament_date(file),
+                entry.get("dates"), entry.get("division"), entry.get("tier"), len(player_dfs),
+            ),
+        ).fetchone()[0]
+        for table in CHILD_TABLES:
+            conn.execute(f"DELETE FROM {table} WHERE tournament_id = ?", (tournament_id,))
+
+        round_pars, layouts = [], {}
+        for r, round_course in enumerate(round_courses):
+            # A round listed without hole lengths was played on the layout of
+            # an earlier round of the same course with the same pars
+            pars = tuple(numeric_column(round_course["course_df"]["Par"]))
+            if round_course["course_df"]["Length (m)"].isna().all() and (round_course["course"], pars) in layouts:
+                layout, pars = layouts[round_course["course"], pars], list(pars)
+            else:
+                layout, pars = layout_id(conn, round_course)
+                layouts.setdefault((round_course["course"], tuple(pars)), layout)
+            conn.execute("INSERT INTO round_layouts VALUES (?, ?, ?)", (tournament_id, r + 1, layout))
+            round_pars.append((pars + [None] * len(course_df))[:len(course_df)])
+        round_pars = np.array(round_pars, dtype=float).reshape(len(player_dfs), len(course_df))
+
+        players = tournament["players"]
+        player_ids = np.array([key_to_id[key] for key in normalize_names(players["Name"])])
+        for r, round_df in enumerate(player_dfs):
+            entries = round_df["Player ID"].to_numpy(dtype=np.int64)
+            conn.executemany(
+                "INSERT INTO rounds VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                zip(
+                    [tournament_id] * len(round_df), [r + 1] * len(round_df), entries.tolist(),
+                    player_ids[entries].tolist(), round_df["Name"].tolist(), round_df["Place"].tolist(),
+                    numeric_column(round_df["Total Score"]), numeric_column(round_df["Round Score"]),
+                    numeric_column(round_df["Rating"]), tournament["dnf"][entries, r].astype(int).tolist(),
+                ),
+            )
+
+        entries, rounds, holes = np.nonzero(~tournament["missing"])
+        strokes = tournament["strokes"][entries, rounds, holes].astype(int)
+        par_diffs = strokes - round_pars[rounds, holes]
+        conn.executemany(
+            "INSERT INTO hole_scores VALUES (?, ?, ?, ?, ?, ?, ?)",
+            zip(
+                [tournament_id] * len(entries), (rounds + 1).tolist(), entries.tolist(), (holes + 1).tolist(),
+                player_ids[entries].tolist(), strokes.tolist(),
+                [None if np.isnan(diff) else int(diff) for diff in par_diffs],
+            ),
+        )
+    return len(entries)
+
+def build_warehouse(data_folder="data", db_file=WAREHOUSE_FILE, mapping_file="tournament_names.txt", force=False):
+    conn = connect(db_file)
+    catalog = load_catalog(data_folder, mapping_file)
+    player_index = load_player_index(data_folder)
+    stored = dict(conn.execute("SELECT file, hash || ':' || schema_version FROM tournaments"))
+
+    with conn:
+        conn.executemany(
+            "INSERT INTO players VALUES (?, ?) ON CONFLICT (player_id) DO UPDATE SET name = excluded.name",
+            enumerate(player_index["names"]),
+        )
+
+    files = sorted(file for file in os.listdir(data_folder) if file.endswith(".csv"))
+    for file in files:
+        file_path = os.path.join(data_folder, file)
+        fingerprint = {"hash": file_hash(file_path), "schema": CACHE_SCHEMA_VERSION}
+        if not force and stored.get(file) == f"{fingerprint['hash']}:{fingerprint['schema']}":
+            print(f"{file}: unchanged, skipped")
+            continue
+        try:
+            scores = ingest_tournament(conn, file_path, catalog["entries"].get(file, {}), fingerprint, player_index["key_to_id"])
+        except ValueError as e:
+            print(f"{file}: failed ({e})")
+            continue
+        print(f"{file}: {scores} hole scores loaded")
+
+    # Tournaments whose export was removed from data/
+    removed = [(file,) for file in stored if file not in files]
+    with conn:
+        for table in CHILD_TABLES:
+            conn.executemany(
+                f"DELETE FROM {table} WHERE tournament_id IN (SELECT tournament_id FROM tournaments WHERE file = ?)",
+                removed,
+            )
+        conn.executemany("DELETE FROM tournaments WHERE file = ?", removed)
+    conn.execute("PRAGMA optimize")
+    conn.close()
+
+
+# %%
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load every tournament into a SQLite warehouse.")
+    parser.add_argument("--data", default="data", help="folder with the tournament exports")
+    parser.add_argument("--db", default=WAREHOUSE_FILE, help="SQLite database file")
+    parser.add_argument("--force", action="store_true", help="reload tournaments even if unchanged")
+    args = parser.parse_args()
+    build_warehouse(args.data, args.db, force=args.force)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Columnar export of the parsed tournaments in data/ as Arrow IPC files, which
+load back memory-mapped without copying. Requires pyarrow.
+
+Usage: python export_columnar.py [--data data] [--out exports/columnar] [--force]
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from export_standings import file_hash, load_manifest, save_manifest
+from show_score import CACHE_SCHEMA_VERSION, compile_tournament, load_parsed_tournament
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+COURSE_FILE, PLAYERS_FILE, HOLE_SCORES_FILE = "course.arrow", "players.arrow", "hole_scores.arrow"
+# Bump whenever the set or layout of the Arrow files changes; see export_standings
+COLUMNAR_FORMAT_VERSION = 1
+ABSENT, PLAYING, DNF = 0, 1, 2  # Values of the hole score table's 'Status' column
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("The columnar export needs pyarrow: pip install pyarrow")
+
+def write_table(table, file_path):
+    # Uncompressed IPC, since compressed buffers can't be memory-mapped as is
+    with pa.OSFile(f"{file_path}.tmp", "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table.combine_chunks())
+    os.replace(f"{file_path}.tmp", file_path)
+
+def mapped_array(table, column):
+    # Each table is written as one record batch, so every column is a single
+    # chunk whose buffers point into the map; combine_chunks() would copy it
+    chunks = table.column(column).chunks
+    return chunks[0] if len(chunks) == 1 else table.column(column).combine_chunks()
+
+def read_table(file_path):
+    with pa.memory_map(file_path, "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+def columnar_tables(course_df, player_dfs, tournament_details, round_info):
+    # Course table, one row per player per round, and a dense (players x rounds)
+    # table whose 'Strokes' column is a fixed-size list of every hole, so the
+    # whole strokes tensor is one contiguous int16 buffer
+    tournament = compile_tournament(course_df, player_dfs)
+    n_players, n_rounds, n_holes = tournament["strokes"].shape
+
+    course = pa.Table.from_pandas(
+        pd.DataFrame({
+            "Hole Number": pd.to_numeric(course_df["Hole Number"], errors="coerce").astype("Int16"),
+            "Length (m)": pd.to_numeric(course_df["Length (m)"], errors="coerce").astype("Int32"),
+            "Par": tournament["par"],
+        }),
+        preserve_index=False,
+    )
+
+    players = pd.concat(
+        [round_df.drop(columns="Hole Scores").assign(Round=np.int8(r + 1)) for r, round_df in enumerate(player_dfs)],
+        ignore_index=True,
+    )
+    players = pa.Table.from_pandas(players, preserve_index=False).replace_schema_metadata({
+        "tournament_details": json.dumps(tournament_details, ensure_ascii=False),
+        "round_info": json.dumps(round_info, ensure_ascii=False),
+    })
+
+    status = np.where(tournament["dnf"], DNF, np.where(tournament["present"], PLAYING, ABSENT)).astype(np.int8)
+    strokes = pa.FixedSizeListArray.from_arrays(pa.array(tournament["strokes"].reshape(-1)), n_holes)
+    hole_scores = pa.table({
+        "Player ID": pa.array(np.repeat(np.arange(n_players, dtype=np.int32), n_rounds)),
+        "Name": pa.array(np.repeat(tournament["players"]["Name"].to_numpy(dtype=object), n_rounds)),
+        "Round": pa.array(np.tile(np.arange(1, n_rounds + 1, dtype=np.int8), n_players)),
+        "Status": pa.array(status.reshape(-1)),
+        "Start Score": pa.array(tournament["start_score"].reshape(-1)),
+        "Strokes": strokes,
+    }).replace_schema_metadata({"shape": json.dumps([n_players, n_rounds, n_holes])})
+
+    return {COURSE_FILE: course, PLAYERS_FILE: players, HOLE_SCORES_FILE: hole_scores}
+
+def export_tournament(file_path, out_dir):
+    require_pyarrow()
+    tournament_dir = os.path.join(out_dir, os.path.splitext(os.path.basename(file_path))[0])
+    tables = columnar_tables(*load_parsed_tournament(file_path))
+    os.makedirs(tournament_dir, exist_ok=True)
+    for file_name, table in tables.items():
+        write_table(table, os.path.join(tournament_dir, file_name))
+    return tournament_dir
+
+def load_columnar_tournament(tournament_dir):
+    # The strokes tensor (players, rounds, holes; 0 where a hole wasn't played)
+    # and the per-player-round arrays are views into the memory-mapped file
+    require_pyarrow()
+    hole_scores = read_table(os.path.join(tournament_dir, HOLE_SCORES_FILE))
+    players = read_table(os.path.join(tournament_dir, PLAYERS_FILE))
+    shape = tuple(json.loads(hole_scores.schema.metadata[b"shape"]))
+
+    return {
+        "course": read_table(os.path.join(tournament_dir, COURSE_FILE)).to_pandas(),
+        "players": players.to_pandas(),
+        "names": hole_scores.column("Name").to_numpy()[::shape[1]],
+        "strokes": mapped_array(hole_scores, "Strokes").values.to_numpy(zero_copy_only=True).reshape(shape),
+        "status": mapped_array(hole_scores, "Status").to_numpy(zero_copy_only=True).reshape(shape[:2]),
+        "start_score": mapped_array(hole_scores, "Start Score").to_numpy(zero_copy_only=True).reshape(shape[:2]),
+        "tournament_details": json.loads(players.schema.metadata[b"tournament_details"]),
+        "round_info": json.loads(players.schema.metadata[b"round_info"]),
+    }
+
+def export_all(data_folder="data", out_dir=os.path.join("exports", "columnar"), force=False):
+    require_pyarrow()
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = load_manifest(out_dir)
+
+    for file in sorted(os.listdir(data_folder)):
+        if not file.endswith(".csv"):
+            continue
+        file_path = os.path.join(data_folder, file)
+        fingerprint = {"hash": file_hash(file_path), "schema": CACHE_SCHEMA_VERSION, "format": COLUMNAR_FORMAT_VERSION}
+        if not force and manifest.get(file) == fingerprint:
+            print(f"{file}: unchanged, skipped")
+            continue
+        try:
+            export_tournament(file_path, out_dir)
+        except ValueError as e:
+            print(f"{file}: failed ({e})")
+            continue
+        manifest[file] = fingerprint
+        print(f"{file}: exported")
+
+    save_manifest(out_dir, manifest)
+    return manifest
+
+
+# %%
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export parsed tournaments as memory-mappable Arrow files.")
+    parser.add_argument("--data", default="data", help="folder with the tournament exports")
+    parser.add_argument("--out", default=os.path.join("exports", "columnar"), help="folder to write the Arrow files into")
+    parser.add_argument("--force", action="store_true", help="re-export tournaments even if unchanged")
+    args = parser.parse_args()
+    export_all(args.data, args.out, args.force)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Headless export of every standings snapshot for the tournaments in data/.
+
+Usage: python export_standings.py [--data data] [--out exports] [--jobs N] [--force]
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from show_score import (
+    CACHE_SCHEMA_VERSION,
+    build_snapshot_store,
+    course_info_csv,
+    get_snapshot,
+    load_parsed_tournament,
+    player_trajectories,
+)
+
+
+MANIFEST_FILE = "manifest.json"
+# Bump whenever the set or layout of exported files changes, so the manifest
+# no longer matches and every tournament is exported again
+EXPORT_FORMAT_VERSION = 2
+
+
+def file_hash(file_path):
+    with open(file_path, "rb") as f:
+        return hashlib.blake2b(f.read()).hexdigest()
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_manifest(out_dir, manifest):
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+    with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+
+def trajectory_export(tournament):
+    # Zstd-compressed Parquet with one row group per round; gzipped CSV when
+    # pyarrow isn't installed
+    trajectories = player_trajectories(tournament)
+    buffer = io.BytesIO()
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        trajectories.to_csv(buffer, index=False, compression={"method": "gzip", "mtime": 0})
+        return "trajectories.csv.gz", buffer.getvalue()
+
+    table = pa.Table.from_pandas(trajectories, preserve_index=False)
+    round_starts = np.flatnonzero(np.diff(trajectories["Round"].to_numpy(), prepend=0))
+    round_ends = np.append(round_starts[1:], len(trajectories))
+    with pq.ParquetWriter(buffer, table.schema, compression="zstd") as writer:
+        for start, end in zip(round_starts, round_ends):
+            writer.write_table(table.slice(start, end - start))
+    return "trajectories.parquet", buffer.getvalue()
+
+def tournament_exports(file_path):
+    # Builds every CSV payload for one tournament before anything is written
+    course_df, player_dfs, _, _ = load_parsed_tournament(file_path)
+    snapshot_store = build_snapshot_store(course_df, player_dfs)
+
+    exports = {}
+    for round_index in range(len(player_dfs)):
+        for hole_num in range(len(snapshot_store["standings"][round_index])):
+            standings_df, hole_diff_averages = get_snapshot(snapshot_store, round_index, hole_num)
+            exports[f"standings_rd{round_index + 1}h{hole_num}.csv"] = standings_df.to_csv(index=False)
+        exports[f"course_info_rd{round_index + 1}.csv"] = course_info_csv(course_df, hole_diff_averages)
+    file_name, payload = trajectory_export(snapshot_store["tournament"])
+    exports[file_name] = payload
+    return exports
+
+def export_tournament(file_path, out_dir):
+    tournament_dir = os.path.join(out_dir, os.path.splitext(os.path.basename(file_path))[0])
+    exports = tournament_exports(file_path)
+    os.makedirs(tournament_dir, exist_ok=True)
+    for file_name, payload in exports.items():
+        if isinstance(payload, bytes):
+            with open(os.path.join(tournament_dir, file_name), "wb") as f:
+                f.write(payload)
+            continue
+        with open(os.path.join(tournament_dir, file_name), "w", encoding="utf-8", newline="") as f:
+            f.write(payload)
+    return len(exports)
+
+def export_all(data_folder="data", out_dir="exports", jobs=None, force=False):
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = load_manifest(out_dir)
+
+    pending = {}
+    for file in sorted(os.listdir(data_folder)):
+        if not file.endswith(".csv"):
+            continue
+        file_path = os.path.join(data_folder, file)
+        fingerprint = {"hash": file_hash(file_path), "schema": CACHE_SCHEMA_VERSION, "format": EXPORT_FORMAT_VERSION}
+        if not force and manifest.get(file) == fingerprint:
+            print(f"{file}: unchanged, skipped")
+            continue
+        pending[file] = (file_path, fingerprint)
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(export_tournament, file_path, out_dir): file
+            for file, (file_path, _) in pending.items()
+        }
+        for future in as_completed(futures):
+            file = futures[future]
+            try:
+                written = future.result()
+            except ValueError as e:
+                print(f"{file}: failed ({e})")
+                continue
+            manifest[file] = pending[file][1]
+            print(f"{file}: {written} files written")
+
+    save_manifest(out_dir, manifest)
+    return manifest
+
+
+# %%
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export standings CSVs for every round and hole of every tournament.")
+    parser.add_argument("--data", default="data", help="folder with the tournament exports")
+    parser.add_argument("--out", default="exports", help="folder to write the CSVs into")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="re-export tournaments even if unchanged")
+    args = parser.parse_args()
+    export_all(args.data, args.out, args.jobs, args.force)
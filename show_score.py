@@ -6,10 +6,26 @@ Created on Tue Nov 26 19:20:54 2024
 @author: tomasvalik
 """
 
+import numpy as np
 import pandas as pd
 import re
 import streamlit as st
 import os
+import io
+import hashlib
+import json
+import mmap
+import pickle
+import sys
+import threading
+import time
+import tracemalloc
+import zipfile
+from collections import OrderedDict
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial, wraps
 
 
 # %% HELPER FUNCTIONS
@@ -17,23 +33,180 @@ import os
 def is_place_difference(line):
     return line.isdigit()
 
-def locate_line(content, keyword):
-    for i, line in enumerate(content):
-        if keyword in line:
+def locate_line(content, keyword, start=0):
+    if isinstance(content, MappedLines):
+        return content.find(keyword, start)
+    for i in range(start, len(content)):
+        if keyword in content[i]:
             return i
     return -1
 
-def parse_tournament_details(content):
-    index = locate_line(content, "TIER")
+def clean_content(content):
+    stripped = (line.strip() for line in content)
+    return [line for line in stripped if line and not line.startswith("CASH LINE")]
+
+# Bytes str.strip() removes from both ends of an ASCII line
+ASCII_WHITESPACE = np.zeros(256, dtype=bool)
+ASCII_WHITESPACE[[9, 10, 11, 12, 13, 28, 29, 30, 31, 32]] = True
+
+class MappedLines(Sequence):
+    # clean_content's result over a raw UTF-8 buffer (bytes or an mmap): only
+    # the (start, end) byte spans of the kept lines are stored, blank and
+    # CASH LINE lines are dropped without being decoded, and a line becomes a
+    # str only when it is indexed
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        data = np.frombuffer(buffer, dtype=np.uint8) if len(buffer) else np.zeros(0, dtype=np.uint8)
+        # \n, \r and \r\n all end a line, as with universal newlines; the empty
+        # span between \r and \n is dropped with the blank lines
+        breaks = np.flatnonzero((data == 10) | (data == 13))
+        starts = np.concatenate(([0], breaks + 1))
+        ends = np.concatenate((breaks, [len(data)]))
+
+        # Trim ASCII whitespace one byte per step from both ends of every line
+        # at once; lines are never indented by more than a few characters
+        while True:
+            trim = starts < ends
+            trim[trim] = ASCII_WHITESPACE[data[starts[trim]]]
+            if not trim.any():
+                break
+            starts[trim] += 1
+        while True:
+            trim = starts < ends
+            trim[trim] = ASCII_WHITESPACE[data[ends[trim] - 1]]
+            if not trim.any():
+                break
+            ends[trim] -= 1
+
+        keep = starts < ends
+        cash_line = b"CASH LINE"
+        for i in np.flatnonzero(keep & (ends - starts >= len(cash_line))):
+            if data[starts[i]] == cash_line[0] and buffer[starts[i]:starts[i] + len(cash_line)] == cash_line:
+                keep[i] = False
+        # A line starting or ending in a non-ASCII byte may still be blank or a
+        # cash line once Unicode whitespace is stripped; only those get decoded
+        edges = keep.copy()
+        edges[keep] = (data[starts[keep]] >= 0x80) | (data[ends[keep] - 1] >= 0x80)
+        for i in np.flatnonzero(edges):
+            line = buffer[starts[i]:ends[i]].decode("utf-8").strip()
+            keep[i] = bool(line) and not line.startswith("CASH LINE")
+
+        self._starts, self._ends = starts[keep], ends[keep]
+
+    @property
+    def buffer(self):
+        return self._buffer
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            buffer = self._buffer
+            spans = zip(self._starts[index].tolist(), self._ends[index].tolist())
+            return [buffer[start:end].decode("utf-8").strip() for start, end in spans]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line index out of range")
+        return self._line(index)
+
+    def _line(self, i):
+        return self._buffer[self._starts[i]:self._ends[i]].decode("utf-8").strip()
+
+    def find(self, keyword, start=0):
+        # Index of the first kept line from 'start' on containing the keyword,
+        # searched in the raw bytes; -1 if there is none
+        keyword = keyword.encode("utf-8")
+        position = int(self._starts[start]) if start < len(self) else len(self._buffer)
+        while True:
+            position = self._buffer.find(keyword, position)
+            if position == -1:
+                return -1
+            line = int(np.searchsorted(self._starts, position, side="right")) - 1
+            if line >= 0 and position + len(keyword) <= self._ends[line]:
+                return line
+            position += 1
+
+    def scan(self):
+        # scan_content's layout from byte searches instead of a pass over every line
+        layout = {keyword: self.find(keyword) for keyword in ("TIER", "MAJOR", "RD 1", "Thru")}
+        layout.update({"player_blocks": [], "block_start": None})
+        line = 0
+        while True:
+            block_start = self.find("ALL PLAYERS", line)
+            if block_start == -1:
+                break
+            block_end = self.find("COLOR ACCESSIBILITY", block_start + 1)
+            if block_end == -1:
+                layout["block_start"] = block_start + 1
+                break
+            layout["player_blocks"].append((block_start + 1, block_end))
+            line = block_end + 1
+        return layout
+
+@contextmanager
+def map_tournament_file(file_path):
+    # MappedLines over a read-only memory map of the file; the lines it hands
+    # out are independent strings, so they stay valid after the map is closed
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield MappedLines(b"")
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield MappedLines(buffer)
+
+def scan_content(content, layout=None, start=0):
+    # Remember the first TIER/MAJOR, RD 1 and Thru markers and the (start, end)
+    # span of every round's player block. The lines from 'start' on are joined
+    # once and searched with str.find, so only the few marker lines cost any
+    # Python work. Passing a previous layout and start resumes on appended lines
+    if layout is None:
+        layout = {"TIER": -1, "MAJOR": -1, "RD 1": -1, "Thru": -1, "player_blocks": [], "block_start": None}
+    text = "\n".join(content[start:])
+    for keyword in ("TIER", "MAJOR", "RD 1", "Thru"):
+        if layout[keyword] == -1:
+            found = text.find(keyword)
+            if found != -1:
+                layout[keyword] = start + text.count("\n", 0, found)
+
+    # A block opens on the line after ALL PLAYERS and closes at the next
+    # COLOR ACCESSIBILITY line; each search starts on the line after the last hit
+    block_start = layout["block_start"]
+    position, line = 0, start
+    while True:
+        found = text.find("ALL PLAYERS" if block_start is None else "COLOR ACCESSIBILITY", position)
+        if found == -1:
+            break
+        line += text.count("\n", position, found)
+        if block_start is None:
+            block_start = line + 1
+        else:
+            layout["player_blocks"].append((block_start, line))
+            block_start = None
+        position = text.find("\n", found) + 1
+        if position == 0:
+            break
+        line += 1
+    layout["block_start"] = block_start
+    return layout
+
+def parse_tournament_details(content, layout=None):
+    if layout is None:
+        layout = scan_content(content)
+    index = layout["TIER"]
     if index == -1:
-        index = locate_line(content, "MAJOR")
+        index = layout["MAJOR"]
     if index == -1:
         raise ValueError("Tournament details not found")
     return content[index + 1:index + 4]
 
-def parse_round_info(content):
-    index = locate_line(content, "RD 1")
-    if index == -1:
+def parse_round_info(content, layout=None):
+    if layout is None:
+        layout = scan_content(content)
+    index = layout["RD 1"]
+    if index == -1 or index + 3 >= len(content):
         raise ValueError("Round information not found")
     return content[index + 3]  # Round info appears after RD1, RD2, RD3
 
@@ -76,41 +249,31 @@ def parse_player_data(content, is_first_round=False):
         except IndexError:
             break
         
-    return pd.DataFrame(rows)
+    return pd.DataFrame(rows, columns=["Place", "Name", "Total Score", "Round Score", "Hole Scores", "Rating"])
 
-def parse_all_player_data(content):
-    round_dfs = []
-    start_index = 0
-    rounds_parsed = 0
-
-    while start_index < len(content):
-        # Locate the start of player data
-        all_players_index = locate_line(content[start_index:], "ALL PLAYERS")
-        if all_players_index == -1:
-            break
-        start_index += all_players_index + 1
+def parse_round_block(round_data, is_first_round=False):
+    round_df = parse_player_data(round_data, is_first_round=is_first_round)
+    round_df["Name"] = round_df["Name"].str.replace(NAME_BOUNDARY, r'\1 \2', regex=True)
+    return round_df
 
-        # Locate the end of player data
-        end_index_relative = locate_line(content[start_index:], "COLOR ACCESSIBILITY")
-        if end_index_relative == -1:
-            raise ValueError("End of player data not found for one of the rounds")
-        end_index = start_index + end_index_relative
+def parse_all_player_data(content, layout=None):
+    if layout is None:
+        layout = scan_content(content)
+    if layout["block_start"] is not None:
+        raise ValueError("End of player data not found for one of the rounds")
+    round_dfs = []
 
-        # Extract and parse this round's data
-        round_data = content[start_index:end_index]
+    for rounds_parsed, (start_index, end_index) in enumerate(layout["player_blocks"]):
         is_first_round = (rounds_parsed == 0)  # First round has no Total Score
-        round_df = parse_player_data(round_data, is_first_round=is_first_round)
-        round_df["Name"] = round_df["Name"].apply(add_space_to_name)
-        round_dfs.append(round_df)
+        round_dfs.append(parse_round_block(content[start_index:end_index], is_first_round=is_first_round))
 
-        # Move the index forward to start after the current round
-        start_index = end_index + 1
-        rounds_parsed += 1
-    
+    assign_player_ids(round_dfs)
     return round_dfs
 
-def parse_course_info(content):
-    index = locate_line(content, "Thru")
+def parse_course_info(content, layout=None):
+    if layout is None:
+        layout = scan_content(content)
+    index = layout["Thru"]
     if index == -1:
         raise ValueError("Course information not found")
     course_info_data = content[index + 1:index + 1 + 18 * 3]  # 18 holes with 3 fields each
@@ -129,55 +292,75 @@ def parse_course_info(content):
         "Par": pars}
         )
 
+def parse_hole_table(content, index):
+    # Hole tables list "hole, length, par" for every hole; some exports drop
+    # the lengths from later rounds and list "hole, par" pairs instead
+    lines = content[index + 1:index + 1 + 18 * 3]
+    holes = [str(n) for n in range(1, 19)]
+    width = 3 if lines[::3][:18] == holes else 2 if lines[::2][:18] == holes else None
+    if width is None:
+        return parse_course_info(content, {"Thru": index})
+    return pd.DataFrame({
+        "Hole Number": lines[:18 * width:width],
+        "Length (m)": lines[1:18 * width:width] if width == 3 else [None] * 18,
+        "Par": lines[width - 1:18 * width:width],
+    })
+
+ROUND_HEADER = re.compile(r"ROUND \d+")
+ROUND_SUFFIX = re.compile(r"\s+Rd\s?\d+$")  # "Red Layout Rd3" is the Red Layout
+
+def parse_round_courses(content):
+    # Every round's page opens with "ROUND n", the course and layout names (or
+    # a single line naming both) and "#", followed by that round's hole table
+    rounds = []
+    index = locate_line(content, "ROUND ")
+    while index != -1:
+        if ROUND_HEADER.fullmatch(content[index]):
+            names = []
+            for line in content[index + 1:index + 4]:
+                if line == "#":
+                    break
+                names.append(line)
+            names = [ROUND_SUFFIX.sub("", name) for name in names]
+            if names:
+                rounds.append({
+                    "course": names[0],
+                    "layout": names[-1],
+                    "course_df": parse_hole_table(content, locate_line(content, "Thru", index)),
+                })
+        index = locate_line(content, "ROUND ", index + 1)
+    return rounds
+
+NAME_BOUNDARY = re.compile(r'([a-záéíóúýčďěňřšťžů])([A-ZÁÉÍÓÚÝČĎĚŇŘŠŤŽŮ])')
+
 def add_space_to_name(name):
-    return re.sub(r'([a-záéíóúýčďěňřšťžů])([A-ZÁÉÍÓÚÝČĎĚŇŘŠŤŽŮ])', r'\1 \2', name)
+    return NAME_BOUNDARY.sub(r'\1 \2', name)
 
 def add_hole_status(player_df, course_df):
-    
-    par_values = course_df['Par'].astype(int).tolist()
-    score_map = {
-        -4: "CONDOR", -3: "ALBATROSS", -2: "EAGLE", -1: "BIRDIE", 0: "PAR", 
-        1: "BOGEY", 2: "DBL BOGEY", 3: "TRPL BOGEY", 4: "4x BOGEY", 5: "5x BOGEY"
-    }
-    
-    hole_diff = []
-    hole_status = []
-    for scores in player_df['Hole Scores']:
-        diffs = []
-        statuses = []
-        for score, par in zip(scores, par_values):
-            try:
-                score_int = int(score)
-            except ValueError:
-                score_int = 999  
-                
-            diff = score_int - par
-            diffs.append(diff)
-            statuses.append(
-                "HOLE IN ONE" if (diff == -2 and par == 3) or (diff == -3 and par == 4) 
-                else score_map.get(diff, f"{diff}x BOGEY")
-            )
-        hole_diff.append(diffs)
-        hole_status.append(statuses)
-    
-    player_df['Hole Diff'] = hole_diff
-    player_df['Hole Status'] = hole_status
+    # 'Hole Diff' and 'Hole Status' hold one row each of a shared int16 diff
+    # matrix and int8 status-code matrix; HOLE_STATUS_LABELS[codes] gives the text
+    par = course_par(course_df)
+    strokes, missing = compile_round_scores(player_df, len(par))
+    player_df['Hole Diff'] = list(hole_diffs(strokes, missing, par).astype(np.int16))
+    player_df['Hole Status'] = list(hole_status_codes(strokes, missing, par))
     return player_df
 
 def parse_data(content):
-    cleaned_content = [line.strip() for line in content if line.strip()]
-    cleaned_content = [line for line in cleaned_content if not line.startswith("CASH LINE")]
-    tournament_details = parse_tournament_details(cleaned_content)
-    round_info = parse_round_info(cleaned_content)
-    course_df = parse_course_info(cleaned_content)
-    player_dfs = parse_all_player_data(cleaned_content)
+    # 'content' is a list of raw lines, or MappedLines, which are clean already
+    mapped = isinstance(content, MappedLines)
+    with profile_stage("clean lines"):
+        cleaned_content = content if mapped else clean_content(content)
+    with profile_stage("scan layout"):
+        layout = cleaned_content.scan() if mapped else scan_content(cleaned_content)
+    with profile_stage("parse details and course"):
+        tournament_details = parse_tournament_details(cleaned_content, layout)
+        round_info = parse_round_info(cleaned_content, layout)
+        course_df = parse_course_info(cleaned_content, layout)
+    with profile_stage("parse players"):
+        player_dfs = parse_all_player_data(cleaned_content, layout)
 
     return course_df, player_dfs, tournament_details, round_info
 
-@st.cache_data
-def cached_parse_data(file):
-    return parse_data(file)
-
 def get_start_scores(player_df):
     if not isinstance(player_df, pd.DataFrame):
         raise ValueError("player_df is not a DataFrame. Received type: {}".format(type(player_df)))
@@ -190,71 +373,48 @@ def get_start_scores(player_df):
     player_df['Start Score'] = player_df['Total Score'] - player_df['Round Score']
     return player_df[['Name', 'Start Score']]
 
-def get_score_midround(player_df, hole_num, course_df):
-    player_df = add_hole_status(player_df, course_df)
-    start_scores = get_start_scores(player_df).copy()
-
-    if hole_num == 0:
-        start_scores.loc[:, 'Total'] = start_scores['Start Score']
-        start_scores.loc[:, 'Rd'] = 0  
-        start_scores.loc[:, 'Hole Scores'] = [[] for _ in range(len(start_scores))]
-        standings_df = start_scores.sort_values(by='Total').reset_index(drop=True)
-    else:
-        cumulative_scores = []
-        round_scores = []
-        hole_scores_upto_hole_num = []
-        hole_status_upto_hole_num = []
-    
-        for start_score, hole_diff, hole_scores, hole_status in zip(
-            start_scores['Start Score'], 
-            player_df['Hole Diff'],
-            player_df['Hole Scores'], 
-            player_df['Hole Status']
-        ):
-            total_diff = sum(hole_diff[:hole_num])
-            cumulative_score = start_score + total_diff
-            
-            round_score = cumulative_score - start_score
-    
-            cumulative_scores.append(cumulative_score)
-            round_scores.append(round_score)
-            hole_scores_upto_hole_num.append(hole_scores[:hole_num])
-            hole_status_upto_hole_num.append(hole_status[:hole_num])
-    
-        start_scores.loc[:, 'Total'] = cumulative_scores
-        start_scores.loc[:, 'Rd'] = round_scores  # Add Round Score column
-        start_scores.loc[:, 'Hole Scores'] = hole_scores_upto_hole_num
-        start_scores.loc[:, 'Hole Status'] = hole_status_upto_hole_num
-    
-        standings_df = start_scores.sort_values(by=['Total', 'Rd', 'Name'], ascending=[True, True, True]).reset_index(drop=True)
+def format_to_par(values):
+    # Formats each distinct value once and maps the labels back by index
+    uniques, inverse = np.unique(values, return_inverse=True)
+    labels = np.array([
+        "DNF" if x == 999 else ("E" if x == 0 else (f"+{x}" if x > 0 else str(x)))
+        for x in uniques.tolist()
+    ], dtype=object)
+    return labels[inverse.reshape(-1)]
 
-    standings_df['Total'] = standings_df['Total'].fillna(999)
-    standings_df['Rd'] = standings_df['Rd'].fillna(999)
+def rank_places(values):
+    # 'min' ranking with a "T" prefix for tied places, from one np.unique pass
+    uniques, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    min_ranks = np.cumsum(counts) - counts + 1
+    labels = np.array([
+        f"T{rank}" if count > 1 else str(rank)
+        for rank, count in zip(min_ranks.tolist(), counts.tolist())
+    ], dtype=object)
+    return labels[inverse.reshape(-1)]
 
-    standings_df['Total'] = standings_df['Total'].astype(int)
-    standings_df['Rd'] = standings_df['Rd'].astype(int)
+def finalize_standings(standings_df):
+    total = np.nan_to_num(standings_df['Total'].to_numpy(dtype=float), nan=999).astype(int)
+    rd = np.nan_to_num(standings_df['Rd'].to_numpy(dtype=float), nan=999).astype(int)
 
-    # Rank players based on Total, using 'min' method for ties
-    standings_df['Place'] = standings_df['Total'].rank(method='min', ascending=True).astype(int)
+    standings_df['Place'] = rank_places(total)
+    standings_df['Total'] = format_to_par(total)
+    standings_df['Rd'] = format_to_par(rd)
 
-    # Now, we handle the formatting of the 'Place' column, including "T" for tied places
-    standings_df['Place'] = standings_df['Place'].apply(
-        lambda x: f"T{x}" if standings_df['Place'].value_counts()[x] > 1 else str(x)
-    )
+    return standings_df[["Place", "Name", 'Total', "Rd", "Hole Scores"]]
 
-    standings_df['Total'] = standings_df['Total'].apply(
-        lambda x: "DNF" if x == 999 else (f"E" if x == 0 else (f"+{x}" if x > 0 else str(x)))
-    )
-    
-    standings_df['Rd'] = standings_df['Rd'].apply(
-        lambda x: "DNF" if x == 999 else (f"E" if x == 0 else (f"+{x}" if x > 0 else str(x)))
-    )
-        
-    hole_diff_df = player_df['Hole Diff'].apply(pd.Series)
-    hole_diff_df = hole_diff_df.applymap(lambda x: pd.NA if x > 900 else x)
-    hole_diff_averages = hole_diff_df.mean(skipna=True).tolist()
+def get_score_midround(player_df, hole_num, course_df):
+    par = course_par(course_df)
+    strokes, missing = compile_round_scores(player_df, len(par))
+    diffs = hole_diffs(strokes, missing, par)
+    names = player_df['Name'].to_numpy(dtype=object)
+
+    total, rd = round_checkpoints(diffs, compile_start_scores(player_df))
+    order = order_checkpoint(names, total[hole_num], rd[hole_num])
+    standings_df = checkpoint_standings(names, player_df['Hole Scores'].tolist(), total, rd, order, hole_num)
+
+    hole_diff_averages = masked_hole_means(diffs, missing).tolist()
 
-    return standings_df[["Place", "Name", 'Total', "Rd", "Hole Scores"]], hole_diff_averages
+    return standings_df, hole_diff_averages
 
 def load_tournament_mapping(file_path):
     mapping = {}
@@ -277,56 +437,1534 @@ def format_with_sign(value):
         return ""
     return f"{value:+.2f}"
 
+def course_info_table(course_df, hole_diff_averages):
+    course_df = course_df[["Hole Number", "Length (m)", "Par"]].copy()
+    course_df["Scoring Average vs. Par"] = [round(x, 2) for x in hole_diff_averages]
+    transposed_course_df = course_df.T.drop(index='Hole Number')
+    transposed_course_df.index = ["Length", "Par", "± Avg"]
+    transposed_course_df.columns = [f"{i+1}" for i in range(transposed_course_df.shape[1])]
+    transposed_course_df.loc["Length"] = transposed_course_df.loc["Length"].astype(int)
+    transposed_course_df.loc["Par"] = transposed_course_df.loc["Par"].astype(int)
+    transposed_course_df.loc["± Avg"] = transposed_course_df.loc["± Avg"].map(format_with_sign)
+    return transposed_course_df
 
-# %% MAIN FUNCTION
+def course_info_csv(course_df, hole_diff_averages):
+    # Course table with signed scoring averages, as offered for download
+    export_course_df = course_df[["Hole Number", "Length (m)", "Par"]].copy()
+    export_course_df["Scoring Average vs. Par"] = [f"{round(x, 2):+.2f}" for x in hole_diff_averages]
+    return export_course_df.to_csv(index=False)
 
-def main():
-    st.set_page_config(page_title="Disc Golf Tournament", layout="wide")
-    
-    data_folder = "data"
-    mapping_file = "tournament_names.txt"
-    
-    tournament_mapping = load_tournament_mapping(mapping_file)
 
-    available_files = [
-        file for file in os.listdir(data_folder) if file.endswith(".csv")
+# %% SCORE TENSOR
+
+MISSING_SCORE = 999  # Stroke value the scoring has always used for unplayed or unreadable holes
+
+def assign_player_ids(player_dfs, ids=None):
+    # Ids follow first appearance across rounds; a repeated name within one
+    # round is told apart by its occurrence number. Passing the ids of earlier
+    # rounds keeps them stable when rounds are added later
+    if ids is None:
+        ids = {}
+    for round_df in player_dfs:
+        if round_df.empty:
+            round_df["Player ID"] = pd.Series(dtype=int)
+            continue
+        seen = {}
+        player_ids = []
+        for name in round_df["Name"].tolist():
+            occurrence = seen[name] = seen.get(name, -1) + 1
+            player_ids.append(ids.setdefault((name, occurrence), len(ids)))
+        round_df["Player ID"] = player_ids
+    return pd.DataFrame({
+        "Player ID": list(ids.values()),
+        "Name": [name for name, _ in ids.keys()]}
+        )
+
+def course_par(course_df):
+    return pd.to_numeric(course_df['Par'], errors='coerce').to_numpy(dtype=np.int16)
+
+def compile_round_scores(player_df, n_holes=18):
+    # Converts the 'Hole Scores' lists into an int16 (players, holes) matrix in
+    # one vectorized call; holes that are absent or not a number are masked
+    padded = [list(scores[:n_holes]) + [""] * (n_holes - len(scores)) for scores in player_df['Hole Scores']]
+    flat = np.array(padded, dtype=object).reshape(-1)
+    numbers = pd.to_numeric(pd.Series(flat, dtype=object), errors='coerce').to_numpy(dtype=float)
+    missing = np.isnan(numbers).reshape(len(padded), n_holes)
+    strokes = np.where(missing, 0, np.nan_to_num(numbers.reshape(len(padded), n_holes))).astype(np.int16)
+    return strokes, missing
+
+def compile_start_scores(player_df):
+    total = pd.to_numeric(player_df['Total Score'].replace("E", "0"), errors='coerce').to_numpy(dtype=float)
+    round_score = pd.to_numeric(player_df['Round Score'].replace("E", "0"), errors='coerce').to_numpy(dtype=float)
+    return total - round_score
+
+def hole_diffs(strokes, missing, par):
+    return np.where(missing, MISSING_SCORE, strokes).astype(np.int32) - par.astype(np.int32)
+
+SCORE_NAMES = {
+    -4: "CONDOR", -3: "ALBATROSS", -2: "EAGLE", -1: "BIRDIE", 0: "PAR",
+    1: "BOGEY", 2: "DBL BOGEY", 3: "TRPL BOGEY", 4: "4x BOGEY", 5: "5x BOGEY"
+}
+MIN_STATUS_DIFF, MAX_STATUS_DIFF = -4, 30
+NOT_PLAYED, HOLE_IN_ONE = 0, 1
+# Shared label table for the int8 hole status codes
+HOLE_STATUS_LABELS = np.array(
+    ["NOT PLAYED", "HOLE IN ONE"]
+    + [SCORE_NAMES.get(diff, f"{diff}x BOGEY") for diff in range(MIN_STATUS_DIFF, MAX_STATUS_DIFF + 1)],
+    dtype=object
+)
+
+def hole_status_codes(strokes, missing, par):
+    diff = strokes.astype(np.int16) - par.astype(np.int16)
+    codes = (np.clip(diff, MIN_STATUS_DIFF, MAX_STATUS_DIFF) - MIN_STATUS_DIFF + 2).astype(np.int8)
+    codes[((diff == -2) & (par == 3)) | ((diff == -3) & (par == 4))] = HOLE_IN_ONE
+    codes[missing] = NOT_PLAYED
+    return codes
+
+def masked_hole_means(diffs, missing):
+    # Mean over the played holes only; a hole nobody finished gives NaN
+    axes = tuple(range(diffs.ndim - 1))
+    counts = (~missing).sum(axis=axes)
+    totals = np.where(missing, 0, diffs).sum(axis=axes)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, totals / np.maximum(counts, 1), np.nan)
+
+def compile_tournament(course_df, player_dfs):
+    par = course_par(course_df)
+    n_holes, n_rounds = len(par), len(player_dfs)
+    if not all("Player ID" in round_df.columns for round_df in player_dfs):
+        players = assign_player_ids(player_dfs)
+    else:
+        ids = pd.concat([round_df[["Player ID", "Name"]] for round_df in player_dfs])
+        players = ids.drop_duplicates("Player ID").sort_values("Player ID").reset_index(drop=True)
+    n_players = len(players)
+
+    strokes = np.zeros((n_players, n_rounds, n_holes), dtype=np.int16)
+    missing = np.ones((n_players, n_rounds, n_holes), dtype=bool)
+    start_score = np.full((n_players, n_rounds), np.nan)
+    row_index = np.full((n_players, n_rounds), -1, dtype=np.int32)
+
+    for r, round_df in enumerate(player_dfs):
+        if round_df.empty:
+            continue
+        player_ids = round_df["Player ID"].to_numpy(dtype=np.int64)
+        strokes[player_ids, r], missing[player_ids, r] = compile_round_scores(round_df, n_holes)
+        start_score[player_ids, r] = compile_start_scores(round_df)
+        row_index[player_ids, r] = np.arange(len(round_df))
+
+    present = row_index >= 0
+    return {
+        "players": players,
+        "par": par,
+        "strokes": strokes,
+        "missing": missing,
+        "present": present,
+        "dnf": present & np.isnan(start_score),
+        "start_score": start_score,
+        "row_index": row_index,
+    }
+
+HISTOGRAM_STROKES = 10  # Stroke counts from this value up share the last histogram bin
+
+def hole_difficulty(tournament):
+    # Per-hole scoring of every round plus the whole event (last row), all from
+    # one masked pass over the score tensor: average vs. par, birdie-or-better
+    # and bogey-or-worse rates, and histograms of strokes (1 .. 10+) and of
+    # hole status codes
+    if "difficulty" in tournament:
+        return tournament["difficulty"]
+    strokes, missing, par = tournament["strokes"], tournament["missing"], tournament["par"]
+    n_rounds, n_holes = strokes.shape[1:]
+    played = ~missing
+    diffs = np.where(played, strokes - par, 0)
+
+    counts = played.sum(axis=0)
+    diff_sums = diffs.sum(axis=0)
+    birdies = (played & (diffs < 0)).sum(axis=0)
+    bogeys = (played & (diffs > 0)).sum(axis=0)
+    bins = np.clip(strokes[played], 1, HISTOGRAM_STROKES) - 1
+    cells = np.broadcast_to(np.arange(n_rounds * n_holes).reshape(n_rounds, n_holes), strokes.shape)[played]
+    histogram = np.bincount(cells * HISTOGRAM_STROKES + bins, minlength=n_rounds * n_holes * HISTOGRAM_STROKES)
+    histogram = histogram.reshape(n_rounds, n_holes, HISTOGRAM_STROKES)
+    n_codes = len(HOLE_STATUS_LABELS)
+    codes = hole_status_codes(strokes, missing, par)[played]
+    outcomes = np.bincount(cells * n_codes + codes, minlength=n_rounds * n_holes * n_codes)
+    outcomes = outcomes.reshape(n_rounds, n_holes, n_codes)
+
+    # Append the event totals as an extra "round"
+    counts, diff_sums, birdies, bogeys, histogram, outcomes = (
+        np.concatenate([values, values.sum(axis=0, keepdims=True)])
+        for values in (counts, diff_sums, birdies, bogeys, histogram, outcomes)
+    )
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rates = lambda values: np.where(counts > 0, values / np.maximum(counts, 1), np.nan)
+        tournament["difficulty"] = charge_memo(tournament, {
+            "average": rates(diff_sums),
+            "birdie_rate": rates(birdies),
+            "bogey_rate": rates(bogeys),
+            "histogram": histogram,
+            "outcomes": outcomes,
+            "played": counts,
+        })
+    return tournament["difficulty"]
+
+def difficulty_rows(difficulty, index):
+    # Birdie and bogey rates of one round (or the event) as extra course table rows
+    rates = pd.DataFrame(
+        [difficulty["birdie_rate"][index], difficulty["bogey_rate"][index]],
+        index=["Birdie %", "Bogey+ %"],
+        columns=[f"{i + 1}" for i in range(difficulty["average"].shape[1])],
+    )
+    return (rates * 100).map(lambda rate: "" if pd.isnull(rate) else f"{rate:.0f}%")
+
+def stroke_histogram(difficulty, index):
+    labels = [str(n) for n in range(1, HISTOGRAM_STROKES)] + [f"{HISTOGRAM_STROKES}+"]
+    return pd.DataFrame(
+        difficulty["histogram"][index].T,
+        index=[f"{label} strokes" for label in labels],
+        columns=[f"{i + 1}" for i in range(difficulty["histogram"].shape[1])],
+    )
+
+def outcome_table(difficulty, index):
+    # Hole outcome counts of one round (or the event); only the codes that
+    # occur are decoded into HOLE_STATUS_LABELS rows
+    outcomes = difficulty["outcomes"][index]
+    shown = np.flatnonzero(outcomes.sum(axis=0))
+    return pd.DataFrame(
+        outcomes[:, shown].T,
+        index=HOLE_STATUS_LABELS[shown],
+        columns=[f"{i + 1}" for i in range(outcomes.shape[0])],
+    )
+
+
+# %% STANDINGS SNAPSHOTS
+
+def round_checkpoints(diffs, start_score):
+    # Row h of each (holes + 1, players) result is the state after h holes;
+    # before the first hole every player sits at their start score with Rd 0
+    n_players = diffs.shape[0]
+    cumulative = np.zeros((n_players, diffs.shape[1] + 1))
+    np.cumsum(diffs, axis=1, out=cumulative[:, 1:])
+    rd = np.where(np.isnan(start_score)[:, None], np.nan, cumulative).T
+    rd[0] = 0
+    total = (start_score[:, None] + cumulative).T
+    return total, rd
+
+def order_checkpoint(names, total, rd):
+    # Sort by Total, then Rd, then Name; NaN (DNF) sorts last
+    _, name_keys = np.unique(names.astype(str), return_inverse=True)
+    return np.lexsort((name_keys, rd, total))
+
+def checkpoint_standings(names, hole_scores, total, rd, order, hole_num):
+    standings_df = pd.DataFrame({
+        'Name': names[order],
+        'Total': total[hole_num][order],
+        'Rd': rd[hole_num][order],
+        'Hole Scores': [hole_scores[i][:hole_num] for i in order]}
+        )
+    return finalize_standings(standings_df)
+
+def round_snapshots(round_df, diffs, missing, start_score):
+    # Standings for every checkpoint of one round plus its hole averages
+    names = round_df['Name'].to_numpy(dtype=object)
+    hole_scores = round_df['Hole Scores'].tolist()
+    total, rd = round_checkpoints(diffs, start_score)
+    standings = [
+        checkpoint_standings(names, hole_scores, total, rd, order_checkpoint(names, total[h], rd[h]), h)
+        for h in range(diffs.shape[1] + 1)
     ]
-    
-    available_files = sorted(available_files, reverse=True)
+    return standings, masked_hole_means(diffs, missing).tolist()
+
+def build_snapshot_store(course_df, player_dfs, tournament=None):
+    if tournament is None:
+        with profile_stage("compile scores"):
+            tournament = compile_tournament(course_df, player_dfs)
+    par = tournament["par"]
+
+    with profile_stage("hole difficulty"):
+        hole_difficulty(tournament)
+
+    store = {"standings": [], "hole_averages": [], "tournament": tournament}
+    for r, round_df in enumerate(player_dfs):
+        player_ids = round_df["Player ID"].to_numpy(dtype=np.int64)
+        missing = tournament["missing"][player_ids, r]
+        diffs = hole_diffs(tournament["strokes"][player_ids, r], missing, par)
+        with profile_stage(f"build snapshots (round {r + 1})"):
+            standings, hole_averages = round_snapshots(round_df, diffs, missing, tournament["start_score"][player_ids, r])
+        store["standings"].append(standings)
+        store["hole_averages"].append(hole_averages)
+
+    return store
+
+def hole_prefix_sums(tournament):
+    # (players, rounds, holes + 1) running sums of score vs. par and of missing
+    # holes, built once per tournament so any hole range costs O(1) per player
+    if "prefix_diffs" not in tournament:
+        diffs = np.where(tournament["missing"], 0, tournament["strokes"] - tournament["par"]).astype(np.int32)
+        shape = diffs.shape[:2] + (diffs.shape[2] + 1,)
+        tournament["prefix_diffs"] = np.zeros(shape, dtype=np.int32)
+        tournament["prefix_missing"] = np.zeros(shape, dtype=np.int32)
+        np.cumsum(diffs, axis=2, out=tournament["prefix_diffs"][:, :, 1:])
+        np.cumsum(tournament["missing"], axis=2, out=tournament["prefix_missing"][:, :, 1:])
+        charge_memo(tournament, [tournament["prefix_diffs"], tournament["prefix_missing"]])
+    return tournament["prefix_diffs"], tournament["prefix_missing"]
+
+def hole_range_scores(tournament, first_hole, last_hole):
+    # Score vs. par over holes first_hole..last_hole (1-based, inclusive) for
+    # every player and round; NaN where a hole in the range was not played
+    if not 1 <= first_hole <= last_hole <= len(tournament["par"]):
+        raise ValueError(f"Invalid hole range {first_hole}-{last_hole}")
+    prefix_diffs, prefix_missing = hole_prefix_sums(tournament)
+    scores = prefix_diffs[:, :, last_hole] - prefix_diffs[:, :, first_hole - 1]
+    unplayed = prefix_missing[:, :, last_hole] - prefix_missing[:, :, first_hole - 1]
+    return np.where((unplayed > 0) | tournament["dnf"], np.nan, scores)
+
+def segment_leaderboard(tournament, first_hole, last_hole, rounds=None):
+    # Ranks every (player, round) score over the hole range, e.g. holes 10-18
+    # of all rounds for a "best back nine" graphic
+    scores = hole_range_scores(tournament, first_hole, last_hole)
+    rounds = range(scores.shape[1]) if rounds is None else rounds
+    player_index, round_index = np.nonzero(np.isfinite(scores[:, list(rounds)]))
+    round_index = np.asarray(list(rounds), dtype=int)[round_index]
+    values = scores[player_index, round_index].astype(int)
+    order = np.lexsort((round_index, player_index, values))
+    par = int(tournament["par"][first_hole - 1:last_hole].sum())
+
+    return pd.DataFrame({
+        "Place": rank_places(values[order]),
+        "Name": tournament["players"]["Name"].to_numpy(dtype=object)[player_index[order]],
+        "Round": round_index[order] + 1,
+        "Score": format_to_par(values[order]),
+        "Strokes": values[order] + par,
+    })
+
+def get_snapshot(store, round_index, hole_num):
+    return store["standings"][round_index][hole_num], store["hole_averages"][round_index]
+
+def build_tournament(file_path):
+    course_df, player_dfs, tournament_details, round_info = load_parsed_tournament(file_path)
+    snapshot_store = build_snapshot_store(course_df, player_dfs)
+    return course_df, player_dfs, tournament_details, round_info, snapshot_store
+
+def load_tournament(file_path, modified):
+    # 'modified' is part of the cache key so an edited export is re-read
+    return shared_tournament_cache().get(file_path, modified, lambda: build_tournament(file_path))
+
+
+# %% SHARED TOURNAMENT CACHE
+
+TOURNAMENT_CACHE_MB = int(os.environ.get("TOURNAMENT_CACHE_MB", "512"))
+
+def estimate_size(value, seen=None):
+    # Rough in-memory footprint of a built tournament. Python objects are
+    # counted once however many frames or lists share them, including the
+    # strings inside object columns such as 'Hole Scores'
+    if seen is None:
+        seen = set()
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return sum(estimate_size(value[column], seen) for column in value.columns) + int(value.index.memory_usage())
+    if isinstance(value, pd.Series):
+        size = int(value.memory_usage(deep=False))
+        if value.dtype == object:
+            size += sum(estimate_size(item, seen) for item in value)
+        return size
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(item, seen) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item, seen) for item in value)
+    return sys.getsizeof(value)
+
+MEMO_BYTES = "memo_bytes"
+
+def charge_memo(container, value):
+    # Data memoized into a cached tournament after it was stored (rank
+    # matrices, projections, CSV payloads) is tallied here, so the shared
+    # cache can charge the entry for it; see TournamentCache.recharge
+    container[MEMO_BYTES] = container.get(MEMO_BYTES, 0) + estimate_size(value)
+    return value
+
+def memo_bytes(value):
+    if isinstance(value, dict):
+        return value.get(MEMO_BYTES, 0) + sum(memo_bytes(item) for item in value.values() if isinstance(item, (dict, tuple)))
+    if isinstance(value, tuple):
+        return sum(memo_bytes(item) for item in value if isinstance(item, (dict, tuple)))
+    return 0
+
+class TournamentCache:
+    # Built tournaments shared by every session of the process. Entries are
+    # evicted least recently used first once max_bytes is exceeded, and
+    # concurrent requests for a tournament still being built wait for that
+    # one build instead of starting their own
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # file_path -> (modified, value, size, memo bytes charged)
+        self.building = {}  # (file_path, modified) -> threading.Event
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.coalesced = self.evictions = 0
+        self.total_bytes = 0
+
+    def get(self, file_path, modified, build):
+        key = (file_path, modified)
+        while True:
+            with self.lock:
+                entry = self.entries.get(file_path)
+                if entry is not None and entry[0] == modified:
+                    self.entries.move_to_end(file_path)
+                    self.hits += 1
+                    self._recharge(file_path)
+                    return entry[1]
+                pending = self.building.get(key)
+                if pending is None:
+                    self.misses += 1
+                    pending = self.building[key] = threading.Event()
+                    break
+                self.coalesced += 1
+            pending.wait()  # Another session is building it; look again once done
+
+        try:
+            value = build()
+        except BaseException:
+            with self.lock:
+                del self.building[key]
+            pending.set()
+            raise
+        with self.lock:
+            self.store(file_path, modified, value)
+            del self.building[key]
+        pending.set()
+        return value
+
+    def store(self, file_path, modified, value):
+        size = estimate_size(value)
+        if file_path in self.entries:
+            self.total_bytes -= self.entries.pop(file_path)[2]
+        self.entries[file_path] = (modified, value, size, memo_bytes(value))
+        self.total_bytes += size
+        self._evict()
+
+    def recharge(self):
+        # Charges every entry for what was memoized into it since it was
+        # stored, e.g. by a fragment rerun that never calls get()
+        with self.lock:
+            for file_path in list(self.entries):
+                if file_path in self.entries:
+                    self._recharge(file_path)
+
+    def _recharge(self, file_path):
+        modified, value, size, charged = self.entries[file_path]
+        grown = memo_bytes(value) - charged
+        if grown:
+            self.entries[file_path] = (modified, value, size + grown, charged + grown)
+            self.total_bytes += grown
+            self._evict()
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            _, (_, _, evicted_size, _) = self.entries.popitem(last=False)
+            self.total_bytes -= evicted_size
+            self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+            }
+
+@st.cache_resource
+def shared_tournament_cache():
+    # One instance per server process, shared across all sessions and reruns
+    return TournamentCache(TOURNAMENT_CACHE_MB * 2**20)
+
+
+# %% MOVERS AND LEADERS
+
+def checkpoint_ranks(tournament):
+    # Totals and 'min' ranks of every player at every checkpoint, as
+    # (players, rounds * (holes + 1)) matrices; column r * (holes + 1) + h is
+    # the state after h holes of round r. DNF and absent players are NaN
+    if "checkpoint_ranks" in tournament:
+        return tournament["checkpoint_ranks"]
+    n_players, n_rounds, n_holes = tournament["strokes"].shape
+    diffs = hole_diffs(tournament["strokes"], tournament["missing"], tournament["par"])
+    cumulative = np.zeros((n_players, n_rounds, n_holes + 1))
+    np.cumsum(diffs, axis=2, out=cumulative[:, :, 1:])
+    in_round = tournament["present"] & ~tournament["dnf"]
+    totals = np.where(in_round[:, :, None], tournament["start_score"][:, :, None] + cumulative, np.nan)
+    totals = totals.reshape(n_players, -1)
+
+    # Sort every column at once; a value's rank is the sorted position of the
+    # first equal value, carried forward with maximum.accumulate
+    order = np.argsort(totals, axis=0, kind="stable")
+    sorted_totals = np.take_along_axis(totals, order, axis=0)
+    positions = np.arange(n_players)[:, None]
+    starts_run = np.ones_like(sorted_totals, dtype=bool)
+    starts_run[1:] = sorted_totals[1:] != sorted_totals[:-1]
+    sorted_ranks = np.maximum.accumulate(np.where(starts_run, positions, 0), axis=0) + 1.0
+    ranks = np.empty_like(totals)
+    np.put_along_axis(ranks, order, sorted_ranks, axis=0)
+    ranks[np.isnan(totals)] = np.nan
+
+    tournament["checkpoint_ranks"] = charge_memo(tournament, {
+        "totals": totals,
+        "ranks": ranks,
+        "sorted_totals": sorted_totals,
+        "order": order,
+        "checkpoints": [(r, h) for r in range(n_rounds) for h in range(n_holes + 1)],
+    })
+    return tournament["checkpoint_ranks"]
+
+def checkpoint_column(tournament, round_index, hole_num):
+    return round_index * (len(tournament["par"]) + 1) + hole_num
+
+def position_changes(tournament, start, end):
+    # Places gained between two (round, hole) checkpoints; positive = moved up
+    ranks = checkpoint_ranks(tournament)["ranks"]
+    before = ranks[:, checkpoint_column(tournament, *start)]
+    after = ranks[:, checkpoint_column(tournament, *end)]
+    both = ~np.isnan(before) & ~np.isnan(after)
+    return pd.DataFrame({
+        "Name": tournament["players"]["Name"].to_numpy(dtype=object)[both],
+        "From": before[both].astype(int),
+        "To": after[both].astype(int),
+        "Change": (before[both] - after[both]).astype(int),
+    })
+
+def biggest_movers(tournament, start, end, count=5):
+    # Risers only gained places and fallers only lost them, so either list
+    # can be shorter than 'count' (or empty) when few players moved
+    changes = position_changes(tournament, start, end)
+    change = changes["Change"].to_numpy()
+    risers = np.argsort(-change, kind="stable")
+    fallers = np.argsort(change, kind="stable")
+    return changes.iloc[risers[change[risers] > 0][:count]].reset_index(drop=True), \
+        changes.iloc[fallers[change[fallers] < 0][:count]].reset_index(drop=True)
+
+def leader_timeline(tournament):
+    # Leader(s) and lead over the next best player at every checkpoint
+    rank_store = checkpoint_ranks(tournament)
+    sorted_totals, order = rank_store["sorted_totals"], rank_store["order"]
+    names = tournament["players"]["Name"].to_numpy(dtype=object)
+    best = sorted_totals[0]
+    runner_up = sorted_totals[1] if len(sorted_totals) > 1 else np.full_like(best, np.nan)
+    leads = rank_store["ranks"] == 1
+
+    leaders = []
+    for column in leads.T:
+        tied = names[column]
+        leaders.append(", ".join(tied) if len(tied) <= 3 else f"{len(tied)} players tied")
+    rounds, holes = np.array(rank_store["checkpoints"]).T if rank_store["checkpoints"] else ([], [])
+    timeline = pd.DataFrame({
+        "Round": np.asarray(rounds) + 1,
+        "Hole": holes,
+        "Leader": leaders,
+        "Total": best,
+        "Lead": runner_up - best,
+    })
+    timeline = timeline[~np.isnan(best)]
+    timeline["Total"] = format_to_par(timeline["Total"].to_numpy(dtype=int))
+    timeline["Lead"] = timeline["Lead"].fillna(0).astype(int)
+    return timeline.reset_index(drop=True)
+
+def player_trajectories(tournament):
+    # Long-format total and place of every player after every hole of the
+    # event; Step 0 is the starting position, then one step per hole played
+    rank_store = checkpoint_ranks(tournament)
+    n_rounds, n_holes = tournament["strokes"].shape[1:]
+    checkpoints = np.array(rank_store["checkpoints"]).reshape(-1, 2)
+    keep = (checkpoints[:, 1] > 0) | (np.arange(len(checkpoints)) == 0)
+    rounds, holes = checkpoints[keep].T
+    totals = rank_store["totals"][:, keep]
+    ranks = rank_store["ranks"][:, keep]
+
+    n_players, n_steps = totals.shape
+    players = tournament["players"]
+    # Step-major, so each frame of an animation is one contiguous slice
+    trajectories = pd.DataFrame({
+        "Step": np.repeat(np.arange(n_steps, dtype=np.int16), n_players),
+        "Round": np.repeat((rounds + 1).astype(np.int8), n_players),
+        "Hole": np.repeat(holes.astype(np.int8), n_players),
+        "Player ID": np.tile(players["Player ID"].to_numpy(), n_steps),
+        "Name": pd.Categorical(np.tile(players["Name"].to_numpy(dtype=object), n_steps)),
+        "Total": pd.array(totals.T.ravel(), dtype="Float32").astype("Int16"),
+        "Place": pd.array(ranks.T.ravel(), dtype="Float32").astype("Int16"),
+    })
+    return trajectories
+
+
+# %% WIN PROBABILITY PROJECTIONS
+
+PROJECTION_TRIALS = 20000
+PROJECTION_QUANTILES = 2**16
+PROJECTION_CHUNK_CELLS = 2**22  # Simulated player finishes held in memory at once
+
+def hole_score_pmfs(tournament, round_index):
+    # Per-hole distribution of score vs. par in the field for one round:
+    # (lowest diff, probabilities from that diff upwards) for every hole
+    played = ~tournament["missing"][:, round_index] & ~tournament["dnf"][:, round_index, None]
+    diffs = tournament["strokes"][:, round_index].astype(np.int32) - tournament["par"].astype(np.int32)
+    pmfs = []
+    for hole in range(diffs.shape[1]):
+        values = diffs[played[:, hole], hole]
+        if len(values) == 0:
+            pmfs.append((0, np.ones(1)))
+            continue
+        low = int(values.min())
+        counts = np.bincount(values - low)
+        pmfs.append((low, counts / counts.sum()))
+    return pmfs
+
+def remaining_score_pmfs(tournament, round_index):
+    # Entry h is the distribution of the summed score vs. par still to come
+    # after h holes of this round, including any later rounds; the sum of
+    # independent holes is the convolution of their distributions
+    pmfs = hole_score_pmfs(tournament, round_index)
+    suffix = [(0, np.ones(1))]
+    for low, pmf in reversed(pmfs):
+        next_low, next_pmf = suffix[-1]
+        suffix.append((low + next_low, np.convolve(pmf, next_pmf)))
+    suffix.reverse()
+
+    later_rounds = tournament["strokes"].shape[1] - round_index - 1
+    round_low, round_pmf = suffix[0]
+    later_low, later_pmf = 0, np.ones(1)
+    for _ in range(later_rounds):
+        later_low, later_pmf = later_low + round_low, np.convolve(later_pmf, round_pmf)
+    return [(low + later_low, np.convolve(pmf, later_pmf)) for low, pmf in suffix]
+
+def project_checkpoint(current, remaining_pmf, trials=PROJECTION_TRIALS, cash_places=None, rng=None):
+    # current: score vs. par now (NaN for DNF); returns win, podium and cash
+    # probabilities from 'trials' simulated finishes of the whole field
+    rng = np.random.default_rng(rng)
+    alive = np.flatnonzero(~np.isnan(current))
+    win = np.zeros(len(current))
+    podium, cash = win.copy(), win.copy()
+    if len(alive) == 0:
+        return win, podium, cash
+    cash_places = int(np.ceil(0.3 * len(alive))) if cash_places is None else cash_places
+
+    # Inverse-CDF sampling through a lookup table of 2**16 equally likely
+    # quantiles, which is much cheaper than a searchsorted per draw; uint16
+    # indexes cover the table exactly
+    low, pmf = remaining_pmf
+    cdf = np.cumsum(pmf)
+    cdf[-1] = 1.0
+    quantiles = np.searchsorted(cdf, (np.arange(PROJECTION_QUANTILES) + 0.5) / PROJECTION_QUANTILES, side="right")
+    quantiles = quantiles.astype(np.int32)
+    base = current[alive].astype(np.int32) + low
+    podium_place, cash_place = min(2, len(alive) - 1), min(cash_places, len(alive)) - 1
+    kth = sorted({0, podium_place, cash_place})
+
+    # Trials are simulated in chunks of about PROJECTION_CHUNK_CELLS draws, so
+    # memory stays flat however large the field or the trial count
+    wins, podiums, cashes = (np.zeros(len(alive)) for _ in range(3))
+    chunk = max(1, PROJECTION_CHUNK_CELLS // len(alive))
+    for done in range(0, trials, chunk):
+        final = quantiles[rng.integers(0, PROJECTION_QUANTILES, (min(chunk, trials - done), len(alive)), dtype=np.uint16)]
+        final += base
+        cutoffs = np.partition(final, kth, axis=1)[:, kth]
+        cutoff = dict(zip(kth, cutoffs.T))
+        winners = final == cutoff[0][:, None]
+        # A tie for the win counts as a playoff each tied player wins equally often
+        wins += (winners / winners.sum(axis=1, keepdims=True)).sum(axis=0)
+        podiums += (final <= cutoff[podium_place][:, None]).sum(axis=0)
+        cashes += (final <= cutoff[cash_place][:, None]).sum(axis=0)
+    win[alive], podium[alive], cash[alive] = wins / trials, podiums / trials, cashes / trials
+    return win, podium, cash
+
+def checkpoint_projection(snapshot_store, round_index, hole_num, trials=PROJECTION_TRIALS, cash_places=None, seed=0):
+    # Memoized in the store, so each checkpoint is simulated at most once
+    key = (round_index, hole_num, trials, cash_places, seed)
+    projections = snapshot_store.setdefault("projections", {})
+    if key in projections:
+        return projections[key]
+
+    tournament = snapshot_store["tournament"]
+    if ("remaining_pmfs", round_index) not in projections:
+        projections[("remaining_pmfs", round_index)] = charge_memo(
+            snapshot_store, remaining_score_pmfs(tournament, round_index)
+        )
+    remaining_pmf = projections[("remaining_pmfs", round_index)][hole_num]
+
+    prefix_diffs, prefix_missing = hole_prefix_sums(tournament)
+    in_round = tournament["present"][:, round_index] & ~tournament["dnf"][:, round_index]
+    current = np.where(in_round, tournament["start_score"][:, round_index] + prefix_diffs[:, round_index, hole_num], np.nan)
+
+    win, podium, cash = project_checkpoint(
+        current, remaining_pmf, trials, cash_places, np.random.default_rng([seed, round_index, hole_num])
+    )
+    projection_df = pd.DataFrame({
+        "Name": tournament["players"]["Name"],
+        "Total": current,
+        "Win %": (100 * win).round(1),
+        "Podium %": (100 * podium).round(1),
+        "Cash %": (100 * cash).round(1),
+    })[in_round].sort_values(["Win %", "Podium %", "Cash %", "Total"], ascending=[False, False, False, True])
+    projection_df["Total"] = format_to_par(projection_df["Total"].to_numpy(dtype=int))
+    projections[key] = charge_memo(snapshot_store, projection_df.reset_index(drop=True))
+    return projections[key]
+
+def build_projection_store(snapshot_store, trials=PROJECTION_TRIALS, cash_places=None, seed=0):
+    n_rounds = len(snapshot_store["standings"])
+    return [
+        [checkpoint_projection(snapshot_store, r, h, trials, cash_places, seed) for h in range(len(snapshot_store["standings"][r]))]
+        for r in range(n_rounds)
+    ]
+
+
+# %% LIVE MODE
+
+LIVE_TAIL_BYTES = 256  # Bytes kept to notice an export that was rewritten instead of appended to
+
+def new_live_state(file_path):
+    return {
+        "file_path": file_path,
+        "offset": 0,
+        "tail": b"",
+        "content": [],
+        "layout": None,
+        "player_ids": {},
+        "course_df": None,
+        "tournament_details": None,
+        "round_info": None,
+        "player_dfs": [],
+        "snapshot_store": {"standings": [], "hole_averages": []},
+        "open_round": False,
+    }
+
+def read_appended_bytes(state):
+    with open(state["file_path"], "rb") as f:
+        if state["offset"]:
+            f.seek(max(state["offset"] - len(state["tail"]), 0))
+            if f.read(len(state["tail"])) != state["tail"]:
+                state.update(new_live_state(state["file_path"]))
+                f.seek(0)
+        appended = f.read()
+    # An unfinished last line is left for the next refresh
+    return appended[:appended.rfind(b"\n") + 1]
+
+def forget_round_csv(store, round_index):
+    # Standings CSVs memoized by snapshot_csv for a round whose snapshots changed
+    payloads = store.get("csv", {})
+    for key in [key for key in payloads if key[0] == round_index]:
+        del payloads[key]
+
+def add_live_round(state, round_df):
+    forget_round_csv(state["snapshot_store"], len(state["player_dfs"]))
+    assign_player_ids([round_df], state["player_ids"])
+    par = course_par(state["course_df"])
+    strokes, missing = compile_round_scores(round_df, len(par))
+    standings, hole_averages = round_snapshots(
+        round_df, hole_diffs(strokes, missing, par), missing, compile_start_scores(round_df)
+    )
+    state["player_dfs"].append(round_df)
+    state["snapshot_store"]["standings"].append(standings)
+    state["snapshot_store"]["hole_averages"].append(hole_averages)
+
+def drop_live_round(state):
+    forget_round_csv(state["snapshot_store"], len(state["player_dfs"]) - 1)
+    state["player_dfs"].pop()
+    state["snapshot_store"]["standings"].pop()
+    state["snapshot_store"]["hole_averages"].pop()
+
+def refresh_live_state(state):
+    # Parses only what was appended since the last refresh and rebuilds the
+    # snapshots of the rounds it touched; returns those round indexes. Nothing
+    # in the state changes until the appended data parsed, so a refresh that
+    # fails is simply retried with more data next time
+    chunk = read_appended_bytes(state)
+    if not chunk:
+        return []
+
+    content = state["content"]
+    start = len(content)
+    content.extend(clean_content(chunk.decode("utf-8").split("\n")))
+    try:
+        previous = state["layout"]
+        blocks_before = len(previous["player_blocks"]) if previous else 0
+        layout = scan_content(content, dict(previous, player_blocks=list(previous["player_blocks"])) if previous else None, start)
+
+        header = None
+        if state["course_df"] is None:
+            if not layout["player_blocks"] and layout["block_start"] is None:
+                del content[start:]
+                return []  # Still inside the page header
+            header = (
+                parse_tournament_details(content, layout),
+                parse_round_info(content, layout),
+                parse_course_info(content, layout),
+            )
+
+        new_rounds = [
+            parse_round_block(content[start_index:end_index], is_first_round=(r == 0))
+            for r, (start_index, end_index) in enumerate(layout["player_blocks"]) if r >= blocks_before
+        ]
+        # A round still being written is parsed provisionally and replaced on
+        # every refresh; until its first player is complete it is left out
+        open_round = None
+        if layout["block_start"] is not None:
+            open_round = parse_round_block(content[layout["block_start"]:], is_first_round=not layout["player_blocks"])
+            if open_round.empty:
+                open_round = None
+    except Exception:
+        del content[start:]
+        raise
+
+    state["offset"] += len(chunk)
+    state["tail"] = (state["tail"] + chunk)[-LIVE_TAIL_BYTES:]
+    state["layout"] = layout
+    if header is not None:
+        state["tournament_details"], state["round_info"], state["course_df"] = header
+
+    if state["open_round"]:
+        drop_live_round(state)
+    changed = []
+    for round_df in new_rounds:
+        add_live_round(state, round_df)
+        changed.append(len(state["player_dfs"]) - 1)
+    state["open_round"] = open_round is not None
+    if state["open_round"]:
+        add_live_round(state, open_round)
+        changed.append(len(state["player_dfs"]) - 1)
+    return changed
+
+def live_tournament(state):
+    return (
+        state["course_df"], state["player_dfs"], state["tournament_details"],
+        state["round_info"], state["snapshot_store"],
+    )
+
+
+# %% PARSED TOURNAMENT CACHE
+
+CACHE_DIR = ".tournament_cache"
+CACHE_SCHEMA_VERSION = 1  # Bump whenever parse_data output changes shape
+
+def cache_file_for(file_path, cache_dir=CACHE_DIR):
+    key = hashlib.blake2b(os.path.abspath(file_path).encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(cache_dir, f"{key}.pkl")
+
+def read_cache_header(cache_file):
+    # Every cache read treats any exception as a miss: besides I/O errors and
+    # truncated files, unpickling objects written by another pandas or numpy
+    # version can raise AttributeError, ModuleNotFoundError, TypeError, ...
+    try:
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+def read_cache_payload(cache_file):
+    with open(cache_file, "rb") as f:
+        pickle.load(f)  # Skip the header
+        return pickle.load(f)
+
+def write_cache_file(cache_file, header, payload):
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    temp_file = f"{cache_file}.{os.getpid()}.tmp"
+    with open(temp_file, "wb") as f:
+        pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_file, cache_file)
+
+def load_parsed_tournament(file_path, cache_dir=CACHE_DIR):
+    # Returns parse_data's (course_df, player_dfs, tournament_details, round_info).
+    # A matching size + mtime is trusted as is; otherwise the content hash
+    # decides whether the cached parse can still be reused
+    stat = os.stat(file_path)
+    cache_file = cache_file_for(file_path, cache_dir)
+    header = read_cache_header(cache_file)
+    if header is not None and header.get("schema") != CACHE_SCHEMA_VERSION:
+        header = None
+
+    if header is not None and header["path"] == os.path.abspath(file_path) \
+            and header["size"] == stat.st_size and header["mtime"] == stat.st_mtime_ns:
+        try:
+            with profile_stage("read disk cache"):
+                return read_cache_payload(cache_file)
+        except Exception:
+            header = None
+
+    with map_tournament_file(file_path) as content:
+        with profile_stage("hash file"):
+            content_hash = hashlib.blake2b(content.buffer).hexdigest()
+
+        payload = None
+        if header is not None and header["hash"] == content_hash:
+            try:
+                payload = read_cache_payload(cache_file)
+            except Exception:
+                payload = None
+        if payload is None:
+            payload = parse_data(content)
+
+    header = {
+        "schema": CACHE_SCHEMA_VERSION,
+        "path": os.path.abspath(file_path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "hash": content_hash,
+    }
+    try:
+        write_cache_file(cache_file, header, payload)
+    except OSError:
+        pass  # A read-only deployment simply runs without the disk cache
+    return payload
+
+
+# %% TOURNAMENT CATALOG
+
+CATALOG_FILE = os.path.join(CACHE_DIR, "catalog.json")
+TIER_PATTERN = re.compile(r"\b([A-Z]*-TIER|MAJOR)\b")
+DATES_PATTERN = re.compile(r"\b[A-Z][a-z]{2} \d{1,2}(?:-(?:[A-Z][a-z]{2} )?\d{1,2})?, \d{4}\b")
+
+def tournament_tier(content, layout):
+    index = layout["TIER"] if layout["TIER"] != -1 else layout["MAJOR"]
+    match = TIER_PATTERN.search(content[index]) if index != -1 else None
+    return match.group(1) if match else None
+
+def tournament_dates(content, layout):
+    # Older exports list the dates among the tournament details, newer ones
+    # a few lines further down the header
+    index = layout["TIER"] if layout["TIER"] != -1 else layout["MAJOR"]
+    for line in content[index + 1:index + 8]:
+        match = DATES_PATTERN.search(line)
+        if match:
+            return match.group(0)
+    return None
+
+def catalog_entry(file_path, display_name):
+    file = os.path.basename(file_path)
+    name_parts = os.path.splitext(file)[0].split("_")
+    stat = os.stat(file_path)
+    entry = {
+        "file": file,
+        "display_name": display_name,
+        "year": name_parts[0],
+        "division": name_parts[2] if len(name_parts) > 2 else None,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+    }
+    try:
+        with map_tournament_file(file_path) as content:
+            layout = content.scan()
+            tier, dates = tournament_tier(content, layout), tournament_dates(content, layout)
+        _, player_dfs, tournament_details, _ = load_parsed_tournament(file_path)
+    except (ValueError, IndexError, KeyError, UnicodeDecodeError) as e:
+        # One unreadable export, e.g. a partial file still being written,
+        # is listed with its error instead of failing the whole catalog
+        entry["error"] = f"{type(e).__name__}: {e}"
+        return entry
+    entry.update({
+        "tier": tier,
+        "dates": dates,
+        "details": tournament_details,
+        "players": int(pd.concat([round_df["Player ID"] for round_df in player_dfs]).nunique()) if player_dfs else 0,
+        "rounds": len(player_dfs),
+    })
+    return entry
+
+def build_catalog(data_folder, mapping_file, previous=None):
+    tournament_mapping = load_tournament_mapping(mapping_file)
+    previous_entries = previous["entries"] if previous else {}
+
+    entries = {}
+    for file in sorted(os.listdir(data_folder), reverse=True):
+        if not file.endswith(".csv"):
+            continue
+        file_path = os.path.join(data_folder, file)
+        entry = previous_entries.get(file)
+        stat = os.stat(file_path)
+        if entry is None or (entry["size"], entry["mtime"]) != (stat.st_size, stat.st_mtime_ns):
+            entry = catalog_entry(file_path, tournament_mapping.get(file))
+        entry["display_name"] = tournament_mapping.get(file)
+        entries[file] = entry
 
     dropdown_list = []
     current_year = None
+    for file, entry in entries.items():
+        if entry["year"] != current_year:
+            dropdown_list.append(f"--- {entry['year']} ---")  # Add a header for the year
+            current_year = entry["year"]
+        dropdown_list.append(file)
+
+    return {
+        "data_mtime": os.stat(data_folder).st_mtime_ns,
+        "mapping_mtime": os.stat(mapping_file).st_mtime_ns if os.path.exists(mapping_file) else None,
+        "entries": entries,
+        "dropdown": dropdown_list,
+    }
+
+def load_catalog(data_folder, mapping_file, catalog_file=CATALOG_FILE):
+    # Rebuilt only when the data folder or the mapping file changed; entries
+    # of files that are unchanged are carried over from the stored catalog
+    data_mtime = os.stat(data_folder).st_mtime_ns
+    mapping_mtime = os.stat(mapping_file).st_mtime_ns if os.path.exists(mapping_file) else None
+    try:
+        with open(catalog_file, "r", encoding="utf-8") as f:
+            catalog = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        catalog = None
+    if catalog is not None and catalog.get("schema") == CACHE_SCHEMA_VERSION \
+            and (catalog["data_mtime"], catalog["mapping_mtime"]) == (data_mtime, mapping_mtime):
+        return catalog
+
+    catalog = build_catalog(data_folder, mapping_file, catalog)
+    catalog["schema"] = CACHE_SCHEMA_VERSION
+    try:
+        os.makedirs(os.path.dirname(catalog_file), exist_ok=True)
+        with open(f"{catalog_file}.tmp", "w", encoding="utf-8") as f:
+            json.dump(catalog, f, ensure_ascii=False)
+        os.replace(f"{catalog_file}.tmp", catalog_file)
+    except OSError:
+        pass
+    return catalog
+
+@st.cache_resource
+def cached_catalog(data_folder, mapping_file, data_mtime, mapping_mtime):
+    # The mtimes are only part of the cache key; see load_catalog
+    return load_catalog(data_folder, mapping_file)
+
+
+# %% PLAYER INDEX
+
+PLAYER_INDEX_FILE = os.path.join(CACHE_DIR, "player_index.pkl")
+FUZZY_MATCH_THRESHOLD = 0.9  # Trigram Dice similarity for two keys to count as one player
+# Letters NFKD does not decompose into an ASCII base letter
+NAME_TRANSLATION = str.maketrans({"ł": "l", "Ł": "L", "ø": "o", "Ø": "O", "ß": "ss", "đ": "d", "Đ": "D"})
+COMBINING_MARKS = re.compile(r"[\u0300-\u036f]")
+NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]")
+
+def normalize_names(names):
+    # "Michael Studnička", "MichaelStudnicka" and "michael studnicka" all
+    # normalize to "michaelstudnicka"
+    names = pd.Series(names, dtype=object).astype(str)
+    return (
+        names.str.translate(NAME_TRANSLATION)
+        .str.normalize("NFKD")
+        .str.replace(COMBINING_MARKS, "", regex=True)
+        .str.lower()
+        .str.replace(NON_ALPHANUMERIC, "", regex=True)
+    )
+
+def name_ngrams(key, n=3):
+    padded = f"^{key}$"
+    return {padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))}
+
+def new_player_index():
+    return {
+        "schema": CACHE_SCHEMA_VERSION,
+        "files": {},  # file -> (size, mtime) of the ingested version
+        "key_to_id": {},  # normalized name -> player id
+        "names": [],  # player id -> first display name seen
+        "ngrams": {},  # trigram -> set of normalized names containing it
+        "appearances": pd.DataFrame(columns=[
+            "Player ID", "Name", "File", "Date", "Round", "Place", "Total Score", "Round Score", "Rating"
+        ]),
+    }
+
+def match_player_key(index, key):
+    # Exact normalized match first, then the closest key by trigram overlap
+    if key in index["key_to_id"]:
+        return index["key_to_id"][key], 1.0
+    grams = name_ngrams(key)
+    overlap = {}
+    for gram in grams:
+        for candidate in index["ngrams"].get(gram, ()):
+            overlap[candidate] = overlap.get(candidate, 0) + 1
+    best_id, best_score = None, 0.0
+    for candidate, shared in overlap.items():
+        score = 2 * shared / (len(grams) + len(name_ngrams(candidate)))
+        if score > best_score:
+            best_id, best_score = index["key_to_id"][candidate], score
+    return best_id, best_score
+
+def register_player_key(index, key, name):
+    player_id, score = match_player_key(index, key)
+    if player_id is None or score < FUZZY_MATCH_THRESHOLD:
+        player_id = len(index["names"])
+        index["names"].append(name)
+    index["key_to_id"][key] = player_id
+    for gram in name_ngrams(key):
+        index["ngrams"].setdefault(gram, set()).add(key)
+    return player_id
+
+def tournament_date(file):
+    # Filenames start with YYYY_MMDD
+    parts = file.split("_")
+    return f"{parts[0]}-{parts[1][:2]}-{parts[1][2:4]}" if len(parts) > 1 and len(parts[1]) >= 4 else parts[0]
+
+def player_appearances(index, file, player_dfs):
+    rows = []
+    for r, round_df in enumerate(player_dfs):
+        if round_df.empty:
+            continue
+        keys = normalize_names(round_df["Name"])
+        player_ids = [
+            index["key_to_id"].get(key) if key in index["key_to_id"] else register_player_key(index, key, name)
+            for key, name in zip(keys, round_df["Name"])
+        ]
+        rows.append(pd.DataFrame({
+            "Player ID": player_ids,
+            "Name": round_df["Name"].to_numpy(),
+            "File": file,
+            "Date": tournament_date(file),
+            "Round": r + 1,
+            "Place": round_df["Place"].to_numpy(),
+            "Total Score": round_df["Total Score"].to_numpy(),
+            "Round Score": round_df["Round Score"].to_numpy(),
+            "Rating": round_df["Rating"].to_numpy(),
+        }))
+    return rows
+
+def refresh_player_index(index, data_folder):
+    # Ingests new or changed exports only; ids of known names never change
+    files = {
+        file: (os.stat(os.path.join(data_folder, file)).st_size, os.stat(os.path.join(data_folder, file)).st_mtime_ns)
+        for file in sorted(os.listdir(data_folder)) if file.endswith(".csv")
+    }
+    stale = {file for file, fingerprint in index["files"].items() if files.get(file) != fingerprint}
+    changed = [file for file, fingerprint in files.items() if index["files"].get(file) != fingerprint]
+    if not stale and not changed:
+        return False
+
+    appearances = index["appearances"]
+    frames = [appearances[~appearances["File"].isin(stale)]] if stale else [appearances]
+    for file in changed:
+        try:
+            _, player_dfs, _, _ = load_parsed_tournament(os.path.join(data_folder, file))
+        except ValueError:
+            continue
+        frames.extend(player_appearances(index, file, player_dfs))
+        index["files"][file] = files[file]
+    for file in stale - set(files):
+        del index["files"][file]
+    index["appearances"] = pd.concat([frame for frame in frames if not frame.empty], ignore_index=True) \
+        .sort_values(["Player ID", "Date", "Round"], kind="stable").reset_index(drop=True)
+    index.pop("positions", None)
+    return True
+
+def load_player_index(data_folder, index_file=PLAYER_INDEX_FILE):
+    try:
+        with open(index_file, "rb") as f:
+            index = pickle.load(f)
+        if index.get("schema") != CACHE_SCHEMA_VERSION:
+            index = new_player_index()
+    except Exception:
+        index = new_player_index()
+
+    if refresh_player_index(index, data_folder):
+        try:
+            os.makedirs(os.path.dirname(index_file), exist_ok=True)
+            with open(f"{index_file}.tmp", "wb") as f:
+                pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f"{index_file}.tmp", index_file)
+        except OSError:
+            pass
+    return index
+
+def find_player(index, name):
+    key = normalize_names([name]).iloc[0]
+    player_id, score = match_player_key(index, key)
+    return (player_id, score) if score >= FUZZY_MATCH_THRESHOLD else (None, score)
+
+def player_history(index, player, since=None):
+    # All rounds of one player (id or any spelling of the name), oldest first;
+    # 'since' is a year or an ISO date
+    player_id = player if isinstance(player, (int, np.integer)) else find_player(index, player)[0]
+    if player_id is None:
+        return index["appearances"].iloc[0:0]
+    if "positions" not in index:
+        index["positions"] = index["appearances"].groupby("Player ID").indices
+    history = index["appearances"].iloc[index["positions"].get(player_id, [])]
+    if since is not None:
+        history = history[history["Date"] >= str(since)]
+    return history
+
+@st.cache_resource
+def cached_player_index(data_folder, data_mtime):
+    # The folder mtime is only part of the cache key; see load_player_index
+    return load_player_index(data_folder)
+
+
+# %% PLAYER STATISTICS
+
+PLAYER_STATS_FILE = os.path.join(CACHE_DIR, "player_stats.pkl")
+# Additive per-player counts; every reported rate is derived from these, so a
+# new tournament only adds rows instead of forcing a corpus recompute
+STAT_COUNT_COLUMNS = [
+    "Rounds", "Holes", "Birdie or Better", "Pars", "Bogey or Worse",
+    "Par 3 Holes", "Par 3 Diff", "Par 4 Holes", "Par 4 Diff", "Par 5 Holes", "Par 5 Diff",
+    "Ratings", "Rating Sum", "Year Sum", "Year Sq Sum", "Year Rating Sum", "Rated Events",
+]
+# Time of the player's first and last rated event, combined by min and max
+STAT_SPAN_COLUMNS = ["First Rated", "Last Rated"]
+# A rating trend needs this many rated events spread over at least this many years
+TREND_MIN_EVENTS, TREND_MIN_YEARS = 3, 0.5
+
+def tournament_stat_counts(tournament, player_dfs, file):
+    # One row of counts per player in the tournament, computed on the score tensor
+    played = ~tournament["missing"]
+    diff = tournament["strokes"].astype(np.int32) - tournament["par"].astype(np.int32)
+    n_players = played.shape[0]
+
+    ratings = np.full(played.shape[:2], np.nan)
+    for r, round_df in enumerate(player_dfs):
+        if not round_df.empty:
+            ratings[round_df["Player ID"].to_numpy(dtype=np.int64), r] = \
+                pd.to_numeric(round_df["Rating"], errors="coerce").to_numpy(dtype=float)
+    has_rating = ~np.isnan(ratings)
+    date = tournament_date(file)
+    year = (int(date[:4]) + (int(date[5:7]) - 1) / 12 - 2000) if len(date) >= 7 else int(date[:4]) - 2000
+
+    counts = {
+        "Key": normalize_names(tournament["players"]["Name"]).to_numpy(),
+        "Name": tournament["players"]["Name"].to_numpy(),
+        "Season": np.full(n_players, file.split("_")[0]),
+        "Rounds": (played.any(axis=2) & ~tournament["dnf"]).sum(axis=1),
+        "Holes": played.sum(axis=(1, 2)),
+        "Birdie or Better": (played & (diff <= -1)).sum(axis=(1, 2)),
+        "Pars": (played & (diff == 0)).sum(axis=(1, 2)),
+        "Bogey or Worse": (played & (diff >= 1)).sum(axis=(1, 2)),
+        "Ratings": has_rating.sum(axis=1),
+        "Rating Sum": np.where(has_rating, ratings, 0).sum(axis=1),
+    }
+    for par_value in (3, 4, 5):
+        par_holes = played & (tournament["par"] == par_value)
+        counts[f"Par {par_value} Holes"] = par_holes.sum(axis=(1, 2))
+        counts[f"Par {par_value} Diff"] = np.where(par_holes, diff, 0).sum(axis=(1, 2))
+    counts["Year Sum"] = counts["Ratings"] * year
+    counts["Year Sq Sum"] = counts["Ratings"] * year ** 2
+    counts["Year Rating Sum"] = counts["Rating Sum"] * year
+    counts["Rated Events"] = (counts["Ratings"] > 0).astype(np.int64)
+    counts["First Rated"] = counts["Last Rated"] = np.where(counts["Ratings"] > 0, year, np.nan)
+    return pd.DataFrame(counts)
+
+def stat_player_ids(index, keys):
+    # Player index ids for the normalized names of count rows, so spellings
+    # the index merged are one player here too; a name the index has not
+    # ingested gets an id past the index's own
+    player_ids = keys.map(index["key_to_id"])
+    unknown = player_ids.isna().to_numpy()
+    player_ids[unknown] = len(index["names"]) + pd.factorize(keys[unknown])[0]
+    return player_ids.astype(np.int64)
+
+def player_stats_table(stat_counts, by_season=False):
+    # 'stat_counts' needs a 'Player ID' column; see stat_player_ids
+    keys = ["Player ID", "Season"] if by_season else ["Player ID"]
+    grouped = stat_counts.groupby(keys, sort=False)
+    totals = grouped[STAT_COUNT_COLUMNS].sum()
+    totals["First Rated"] = grouped["First Rated"].min()
+    totals["Last Rated"] = grouped["Last Rated"].max()
+    totals["Name"] = grouped["Name"].first()
+    totals = totals.reset_index()
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        holes = totals["Holes"].where(totals["Holes"] > 0)
+        table = pd.DataFrame({
+            "Name": totals["Name"],
+            **({"Season": totals["Season"]} if by_season else {}),
+            "Rounds": totals["Rounds"],
+            "Holes": totals["Holes"],
+            "Birdie %": (100 * totals["Birdie or Better"] / holes).round(1),
+            "Par or Better %": (100 * (totals["Birdie or Better"] + totals["Pars"]) / holes).round(1),
+            "Bogey+ %": (100 * totals["Bogey or Worse"] / holes).round(1),
+            **{
+                f"Par {par_value} Avg": (
+                    totals[f"Par {par_value} Diff"] / totals[f"Par {par_value} Holes"].where(totals[f"Par {par_value} Holes"] > 0)
+                ).round(2)
+                for par_value in (3, 4, 5)
+            },
+            "Avg Rating": (totals["Rating Sum"] / totals["Ratings"].where(totals["Ratings"] > 0)).round(0),
+        })
+        # Least-squares slope of rating against time, in rating points per year;
+        # blank when the ratings are too few or too close together to extrapolate
+        n, sum_x, sum_y = totals["Ratings"], totals["Year Sum"], totals["Rating Sum"]
+        denominator = n * totals["Year Sq Sum"] - sum_x ** 2
+        spread = (totals["Rated Events"] >= TREND_MIN_EVENTS) \
+            & (totals["Last Rated"] - totals["First Rated"] >= TREND_MIN_YEARS)
+        table["Rating Trend / Year"] = ((n * totals["Year Rating Sum"] - sum_x * sum_y)
+                                        / denominator.where(spread & (denominator.abs() > 1e-9))).round(1)
+    table.insert(0, "Player ID", totals["Player ID"])
+    return table
+
+def load_player_stat_counts(data_folder, stats_file=PLAYER_STATS_FILE):
+    # Per-file count tables, persisted; only new or changed exports are computed
+    try:
+        with open(stats_file, "rb") as f:
+            stored = pickle.load(f)
+        if (stored.get("schema"), stored.get("columns")) != (CACHE_SCHEMA_VERSION, STAT_COUNT_COLUMNS + STAT_SPAN_COLUMNS):
+            stored = {"files": {}}
+    except Exception:
+        stored = {"files": {}}
+    stored.update(schema=CACHE_SCHEMA_VERSION, columns=STAT_COUNT_COLUMNS + STAT_SPAN_COLUMNS)
+
+    current = {}
+    updated = False
+    for file in sorted(os.listdir(data_folder)):
+        if not file.endswith(".csv"):
+            continue
+        file_path = os.path.join(data_folder, file)
+        stat = os.stat(file_path)
+        fingerprint = (stat.st_size, stat.st_mtime_ns)
+        entry = stored["files"].get(file)
+        if entry is None or entry[0] != fingerprint:
+            try:
+                course_df, player_dfs, _, _ = load_parsed_tournament(file_path)
+            except ValueError:
+                continue
+            entry = (fingerprint, tournament_stat_counts(compile_tournament(course_df, player_dfs), player_dfs, file))
+            updated = True
+        current[file] = entry
+    updated = updated or set(current) != set(stored["files"])
+    stored["files"] = current
+
+    if updated:
+        try:
+            os.makedirs(os.path.dirname(stats_file), exist_ok=True)
+            with open(f"{stats_file}.tmp", "wb") as f:
+                pickle.dump(stored, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f"{stats_file}.tmp", stats_file)
+        except OSError:
+            pass
+    frames = [counts for _, counts in current.values()]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["Key", "Name", "Season"] + STAT_COUNT_COLUMNS + STAT_SPAN_COLUMNS)
+
+@st.cache_resource
+def cached_player_stats(data_folder, data_mtime):
+    # The folder mtime is only part of the cache key
+    stat_counts = load_player_stat_counts(data_folder)
+    stat_counts["Player ID"] = stat_player_ids(cached_player_index(data_folder, data_mtime), stat_counts["Key"])
+    return player_stats_table(stat_counts), player_stats_table(stat_counts, by_season=True)
+
+
+# %% DOWNLOADS
 
-    for file in available_files:
-        year = file.split("_")[0]  # Extract the year from the filename
-        if year != current_year:
-            dropdown_list.append(f"--- {year} ---")  # Add a header for the year
-            current_year = year
-        dropdown_list.append(file)  # Add the tournament file
+ARCHIVE_DIR = os.path.join(CACHE_DIR, "archives")
+
+def snapshot_csv(store, round_index, hole_num):
+    # Standings CSV of one checkpoint, built on first request and then kept in
+    # the snapshot store next to the standings it came from
+    payloads = store.setdefault("csv", {})
+    if (round_index, hole_num) not in payloads:
+        standings_df, _ = get_snapshot(store, round_index, hole_num)
+        payloads[round_index, hole_num] = charge_memo(store, standings_df.to_csv(index=False))
+    return payloads[round_index, hole_num]
+
+def archive_file_for(file_path, modified, archive_dir=ARCHIVE_DIR):
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(archive_dir, f"{name}_{int(modified * 1e9)}.zip")
+
+def write_snapshot_archive(archive_path, course_df, snapshot_store):
+    # Every standings snapshot and per-round course table of one event in a
+    # zip. Each entry is written straight into the archive as it is produced,
+    # so only one CSV is ever held in memory
+    os.makedirs(os.path.dirname(archive_path), exist_ok=True)
+    tmp_path = f"{archive_path}.{threading.get_ident()}.tmp"
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for round_index, round_standings in enumerate(snapshot_store["standings"]):
+            for hole_num in range(len(round_standings)):
+                standings_df, hole_diff_averages = get_snapshot(snapshot_store, round_index, hole_num)
+                with archive.open(f"standings_rd{round_index + 1}h{hole_num}.csv", "w") as entry:
+                    with io.TextIOWrapper(entry, encoding="utf-8", newline="") as text:
+                        standings_df.to_csv(text, index=False)
+            archive.writestr(f"course_info_rd{round_index + 1}.csv", course_info_csv(course_df, hole_diff_averages))
+    os.replace(tmp_path, archive_path)
+
+    # Archives of earlier versions of the same export are stale now
+    prefix = os.path.basename(archive_path).rsplit("_", 1)[0] + "_"
+    for file in os.listdir(os.path.dirname(archive_path)):
+        if file.startswith(prefix) and file.endswith(".zip") and file != os.path.basename(archive_path) \
+                and file[len(prefix):-len(".zip")].isdigit():
+            os.remove(os.path.join(os.path.dirname(archive_path), file))
+    return archive_path
+
+def read_file_bytes(file_path):
+    with open(file_path, "rb") as f:
+        return f.read()
+
+class ArchiveBuilder:
+    # Builds event archives on a background thread so the page stays
+    # responsive; one job per archive path, shared by every session
+
+    def __init__(self, workers=1):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="archive")
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def submit(self, archive_path, course_df, snapshot_store):
+        with self._lock:
+            job = self._jobs.get(archive_path)
+            if job is None or (job.done() and job.exception() is not None):
+                job = self._jobs[archive_path] = self._executor.submit(
+                    write_snapshot_archive, archive_path, course_df, snapshot_store
+                )
+            return job
+
+    def job(self, archive_path):
+        with self._lock:
+            return self._jobs.get(archive_path)
+
+@st.cache_resource
+def archive_builder():
+    return ArchiveBuilder()
+
+
+# %% DIAGNOSTICS
+
+DIAGNOSTICS_LOG = os.environ.get("TOURNAMENT_DIAGNOSTICS_LOG")  # JSON lines file, one line per rerun
+_profile = threading.local()  # Streamlit runs each session's rerun on its own thread
+
+def start_profiling(trace_memory=False):
+    _profile.records = []
+    _profile.depth = 0
+    _profile.trace_memory = trace_memory and not tracemalloc.is_tracing()
+    if _profile.trace_memory:
+        tracemalloc.start()
+
+def stop_profiling():
+    records = getattr(_profile, "records", None) or []
+    peak = None
+    if getattr(_profile, "trace_memory", False):
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    _profile.records = None
+    return {"stages": records, "peak_bytes": peak}
+
+@contextmanager
+def profile_stage(name):
+    # No-op unless start_profiling was called on this thread
+    records = getattr(_profile, "records", None)
+    if records is None:
+        yield
+        return
+    record = {"stage": name, "depth": _profile.depth}
+    records.append(record)
+    _profile.depth += 1
+    memory_before = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record["seconds"] = time.perf_counter() - start
+        if memory_before is not None and tracemalloc.is_tracing():
+            record["allocated_bytes"] = tracemalloc.get_traced_memory()[0] - memory_before
+        _profile.depth -= 1
+
+def profiled_fragment(name):
+    # A fragment rerun never goes through main(), so when diagnostics are on
+    # the fragment profiles itself and shows its own timings; during a full
+    # run it is just another stage of the page
+    def decorate(fragment):
+        @wraps(fragment)
+        def run(*args, **kwargs):
+            if getattr(_profile, "records", None) is not None or not st.session_state.get("diagnostics", False):
+                with profile_stage(name):
+                    return fragment(*args, **kwargs)
+            start_profiling(trace_memory=True)
+            try:
+                with profile_stage(name):
+                    result = fragment(*args, **kwargs)
+            finally:
+                profile = stop_profiling()
+            show_diagnostics(profile)
+            if DIAGNOSTICS_LOG:
+                write_profile(profile, DIAGNOSTICS_LOG, file=st.session_state.get("selected_file"), fragment=name)
+            return result
+        return run
+    return decorate
+
+def write_profile(profile, log_file, **context):
+    with open(log_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"timestamp": time.time(), **context, **profile}, ensure_ascii=False) + "\n")
+
+def show_diagnostics(profile):
+    with st.expander("Diagnostics", expanded=True):
+        stages_df = pd.DataFrame(profile["stages"], columns=["stage", "depth", "seconds", "allocated_bytes"])
+        stages_df["stage"] = ["  " * depth + stage for stage, depth in zip(stages_df["stage"], stages_df["depth"])]
+        stages_df["ms"] = (stages_df["seconds"] * 1000).round(2)
+        stages_df["allocated KiB"] = (stages_df["allocated_bytes"] / 1024).round(1)
+        st.dataframe(stages_df[["stage", "ms", "allocated KiB"]], hide_index=True)
+        if profile["peak_bytes"] is not None:
+            st.caption(f"Peak traced memory this rerun: {profile['peak_bytes'] / 2**20:.2f} MiB")
+        st.caption(f"Shared tournament cache: {shared_tournament_cache().stats()}")
+
+
+# %% MAIN FUNCTION
+
+def main():
+    st.set_page_config(page_title="Disc Golf Tournament", layout="wide")
+
+    diagnostics = st.session_state.get("diagnostics", False)
+    if diagnostics:
+        start_profiling(trace_memory=True)
+    try:
+        with profile_stage("page"):
+            show_tournament()
+    finally:
+        profile = stop_profiling() if diagnostics else None
+
+    st.toggle("Diagnostics", key="diagnostics", help="Time each stage of the next rerun")
+    if profile is not None:
+        show_diagnostics(profile)
+        if DIAGNOSTICS_LOG:
+            write_profile(profile, DIAGNOSTICS_LOG, file=st.session_state.get("selected_file"))
+
+def show_tournament():
+    data_folder = "data"
+    mapping_file = "tournament_names.txt"
+    
+    with profile_stage("catalog"):
+        catalog = cached_catalog(
+            data_folder, mapping_file, os.stat(data_folder).st_mtime_ns,
+            os.stat(mapping_file).st_mtime_ns if os.path.exists(mapping_file) else None,
+        )
+    catalog_entries = catalog["entries"]
 
     selected_option = st.selectbox(
         "Select a tournament you'd like to display:",
-        options=dropdown_list,
-        format_func=lambda x: tournament_mapping.get(x, x) if not x.startswith("---") else x,
+        options=catalog["dropdown"],
+        format_func=lambda x: x if x.startswith("---") else (catalog_entries[x]["display_name"] or x),
     )
 
     if not selected_option or selected_option.startswith("---"):
         st.warning("Please select a valid tournament, not a year header.")
         return
 
-    selected_file = selected_option
+    selected_file = st.session_state["selected_file"] = selected_option
     file_path = os.path.join(data_folder, selected_file)
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.readlines()
 
-    course_df, player_dfs, tournament_details, round_info = parse_data(content)
+    live = st.toggle("Live mode", help="Follow an export that is still being written; only new data is parsed")
+    if live:
+        live_state = st.session_state.get("live_state")
+        if live_state is None or live_state["file_path"] != file_path:
+            live_state = st.session_state["live_state"] = new_live_state(file_path)
+        st.button("Refresh")
+        with profile_stage("live refresh"):
+            refresh_live_state(live_state)
+        if not live_state["player_dfs"]:
+            st.info("Waiting for player data in the export.")
+            return
+        course_df, player_dfs, tournament_details, round_info, snapshot_store = live_tournament(live_state)
+    else:
+        with profile_stage("load tournament"):
+            course_df, player_dfs, tournament_details, round_info, snapshot_store = load_tournament(
+                file_path, os.path.getmtime(file_path)
+            )
 
-    st.title(tournament_mapping.get(selected_file, "Tournament Details"))
+    st.title(catalog_entries[selected_file]["display_name"] or "Tournament Details")
     st.markdown(f":date: {tournament_details[1]}, :round_pushpin: {tournament_details[2]}")
-            
-    file_path = os.path.join(data_folder, selected_file)
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.readlines()
     
     st.divider()
 
@@ -341,7 +1979,26 @@ def main():
     if selected_round is None:
         selected_round = 0
 
-    
+    # Each section below is a fragment: its own widgets rerun only that
+    # section, so scrubbing through holes leaves the rest of the page alone
+    standings_fragment(course_df, player_dfs, snapshot_store, selected_round)
+    segment_fragment(course_df, player_dfs, snapshot_store, selected_round)
+    player_history_fragment(data_folder, player_dfs[selected_round])
+
+    st.divider()
+
+    course_fragment(course_df, player_dfs, snapshot_store, selected_round)
+
+    st.divider()
+
+    downloads_fragment(
+        course_df, snapshot_store, selected_round,
+        None if live else archive_file_for(file_path, os.path.getmtime(file_path)),
+    )
+
+@st.fragment
+@profiled_fragment("standings fragment")
+def standings_fragment(course_df, player_dfs, snapshot_store, selected_round):
     hole_options = {i: f'{i}' for i in range(0, 19)}  # Mapping for holes 1 to 18
     selected_hole = st.segmented_control(
         "Select a hole",
@@ -362,54 +2019,142 @@ def main():
            (f"Standings After {selected_hole} Hole" if selected_hole == 1 else f"Standings After {selected_hole} Holes"))))
     )
 
-    player_df = player_dfs[selected_round]
-    
-    if not isinstance(player_df, pd.DataFrame):
+    if not isinstance(player_dfs[selected_round], pd.DataFrame):
         st.error("Error: Selected round does not contain valid player data.")
-    else:
-        standings_df, hole_diff_averages = get_score_midround(player_df, selected_hole, course_df)
+        return
+
+    standings_df, _ = get_snapshot(snapshot_store, selected_round, selected_hole)
+    with profile_stage("render standings"):
         st.dataframe(standings_df, hide_index=True)
 
-    st.divider()
-    
+    st.download_button(
+        label="Download Standings as CSV",
+        data=partial(snapshot_csv, snapshot_store, selected_round, selected_hole),
+        file_name=f"standings_rd{selected_round+1}h{selected_hole}.csv",
+        mime="text/csv"
+    )
+
+    if "tournament" in snapshot_store:
+        with st.expander("Win Probability"):
+            with profile_stage("win probability"):
+                st.dataframe(checkpoint_projection(snapshot_store, selected_round, selected_hole), hide_index=True)
+                shared_tournament_cache().recharge()
+            st.caption(f"{PROJECTION_TRIALS:,} simulated finishes, remaining holes drawn from this round's field scoring")
+
+        with st.expander("Movers & Leaders"):
+            with profile_stage("movers and leaders"):
+                tournament = snapshot_store["tournament"]
+                previous = (selected_round, selected_hole - 1) if selected_hole > 0 else \
+                    (selected_round - 1, len(course_df)) if selected_round > 0 else None
+                if previous is not None:
+                    risers, fallers = biggest_movers(tournament, previous, (selected_round, selected_hole))
+                    risers_column, fallers_column = st.columns(2)
+                    risers_column.dataframe(risers, hide_index=True)
+                    fallers_column.dataframe(fallers, hide_index=True)
+                st.dataframe(leader_timeline(tournament), hide_index=True)
+
+@st.fragment
+@profiled_fragment("segment fragment")
+def segment_fragment(course_df, player_dfs, snapshot_store, selected_round):
+    with st.expander("Segment Leaderboard"):
+        first_hole, last_hole = st.select_slider(
+            "Holes", options=list(range(1, len(course_df) + 1)), value=(10, len(course_df))
+        )
+        all_rounds = st.checkbox("All rounds")
+        with profile_stage("segment leaderboard"):
+            tournament = snapshot_store.get("tournament") or compile_tournament(course_df, player_dfs)
+            st.dataframe(
+                segment_leaderboard(tournament, first_hole, last_hole, None if all_rounds else [selected_round]),
+                hide_index=True
+            )
+
+@st.fragment
+@profiled_fragment("player history fragment")
+def player_history_fragment(data_folder, player_df):
+    with st.expander("Player History"):
+        history_name = st.selectbox("Player", options=sorted(player_df["Name"]), index=None)
+        if history_name:
+            with profile_stage("player history"):
+                player_index = cached_player_index(data_folder, os.stat(data_folder).st_mtime_ns)
+                _, season_stats = cached_player_stats(data_folder, os.stat(data_folder).st_mtime_ns)
+                history_id, _ = find_player(player_index, history_name)
+                st.dataframe(season_stats[season_stats["Player ID"] == history_id].drop(columns="Player ID"), hide_index=True)
+                st.dataframe(player_history(player_index, history_name), hide_index=True)
+
+@st.fragment
+@profiled_fragment("course fragment")
+def course_fragment(course_df, player_dfs, snapshot_store, selected_round):
     st.subheader("Course Information")
-    course_df["Scoring Average vs. Par"] = [round(x, 2) for x in hole_diff_averages]
-    transposed_course_df = course_df.T.drop(index='Hole Number')
-    transposed_course_df.index = ["Length", "Par", "± Avg"]
-    transposed_course_df.columns = [f"{i+1}" for i in range(transposed_course_df.shape[1])]
-    transposed_course_df.loc["Length"] = transposed_course_df.loc["Length"].astype(int)
-    transposed_course_df.loc["Par"] = transposed_course_df.loc["Par"].astype(int)
-    transposed_course_df.loc["± Avg"] = transposed_course_df.loc["± Avg"].map(format_with_sign)
+    difficulty = snapshot_store["tournament"]["difficulty"] if "tournament" in snapshot_store else None
+    scope = "Round"
+    if difficulty is not None:
+        scope = st.segmented_control(
+            "Scoring", options=["Round", "Event"], default="Round", key="course_scope", label_visibility="collapsed"
+        ) or "Round"
+    scope_index = selected_round if scope == "Round" else len(player_dfs)
+    with profile_stage("course table"):
+        if difficulty is None:
+            transposed_course_df = course_info_table(course_df, snapshot_store["hole_averages"][selected_round])
+        else:
+            transposed_course_df = pd.concat([
+                course_info_table(course_df, difficulty["average"][scope_index]),
+                difficulty_rows(difficulty, scope_index),
+            ])
 
     total_length, total_par = transposed_course_df.loc["Length"].sum(), transposed_course_df.loc["Par"].sum()
     
     st.markdown(f" :straight_ruler: **Length:**  {total_length} m, :flying_disc: **Par:**  {total_par}")
 
-    st.dataframe(transposed_course_df, hide_index=False)
-
-    st.divider()
+    with profile_stage("render course"):
+        st.dataframe(transposed_course_df, hide_index=False)
+        if difficulty is not None:
+            with st.expander("Score Distribution"):
+                st.dataframe(stroke_histogram(difficulty, scope_index), hide_index=False)
+                st.dataframe(outcome_table(difficulty, scope_index), hide_index=False)
 
+@st.fragment
+@profiled_fragment("downloads fragment")
+def downloads_fragment(course_df, snapshot_store, selected_round, archive_path=None):
     st.subheader("Download Assets")
     
-    st.download_button(
-        label="Download Standings as CSV",
-        data=standings_df.to_csv(index=False),
-        file_name=f"standings_rd{selected_round+1}h{selected_hole}.csv",
-        mime="text/csv"
-    )
-    
-    # Create a copy for exporting with signs
-    export_course_df = course_df.copy()
-    export_course_df["Scoring Average vs. Par"] = export_course_df["Scoring Average vs. Par"].map(lambda x: f"{x:+.2f}")
+    with profile_stage("downloads"):
+        # Download button with signs in CSV
+        st.download_button(
+            label="Download Course Info as CSV (with ± signs)",
+            data=partial(course_info_csv, course_df, snapshot_store["hole_averages"][selected_round]),
+            file_name="course_info.csv",
+            mime="text/csv"
+        )
+
+    if archive_path is None:
+        return
+    builder = archive_builder()
+    if not os.path.exists(archive_path):
+        job = builder.job(archive_path)
+        if job is not None and job.done() and job.exception() is not None:
+            st.error(f"Building the snapshot archive failed: {job.exception()}")
+        if (job is None or job.done()) and st.button("Prepare All Snapshots (zip)"):
+            job = builder.submit(archive_path, course_df, snapshot_store)
+        if job is not None and not job.done():
+            archive_progress_fragment(archive_path)
+        if not os.path.exists(archive_path):
+            return
 
-    # Download button with signs in CSV
     st.download_button(
-        label="Download Course Info as CSV (with ± signs)",
-        data=export_course_df.to_csv(index=False),
-        file_name="course_info.csv",
-        mime="text/csv"
+        label="Download All Snapshots (zip)",
+        data=partial(read_file_bytes, archive_path),
+        file_name=os.path.basename(archive_path),
+        mime="application/zip"
     )
 
+@st.fragment(run_every=1)
+@profiled_fragment("archive progress fragment")
+def archive_progress_fragment(archive_path):
+    # Polls the background build; once it is done the page reruns to offer the download
+    job = archive_builder().job(archive_path)
+    if job is None or job.done():
+        st.rerun()
+    st.info("Building the snapshot archive...")
 
 
 # %%
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Writes synthetic tournament exports in the same text layout as the files in
+data/, so the parser and scoring can be tested and benchmarked at scale.
+
+Usage: python synthetic_tournament.py OUT.csv [--players 1000] [--rounds 3] [--seed 0]
+"""
+
+import argparse
+
+import numpy as np
+
+
+FIRST_NAMES = ["Jan", "Petr", "Tomáš", "Jakub", "Martin", "Lukáš", "Ondřej", "Michal", "David", "Kryštof", "Filip", "Šimon"]
+LAST_NAMES = ["Novák", "Svoboda", "Dvořák", "Černý", "Procházka", "Kučera", "Veselý", "Horák", "Němec", "Marek", "Říha", "Žák"]
+DEFAULT_PARS = [4, 3, 3, 3, 3, 4, 3, 5, 4, 4, 4, 3, 3, 4, 3, 3, 3, 3]
+# Probability of each score relative to par for an average player
+DEFAULT_SCORE_PROBS = {-2: 0.01, -1: 0.17, 0: 0.55, 1: 0.2, 2: 0.05, 3: 0.02}
+LEGEND = [
+    "Ace", "Eagle", "Birdie", "Bogey", "Dbl Bogey +", "Fairway ", "Short ", "Off Fairway ",
+    "Parked (<3.3m) ", "C1 (0-10m) ", "C2 (10-20m) ", "OB ", "Hazard ", "Penalty ", "THROW TRACKER", "METRIC",
+]
+
+
+def format_to_par(value):
+    return "E" if value == 0 else (f"+{value}" if value > 0 else str(value))
+
+def place_labels(totals):
+    # 'min' ranking with "T" for ties, matching the results page
+    order = np.argsort(totals, kind="stable")
+    sorted_totals = totals[order]
+    first = np.searchsorted(sorted_totals, sorted_totals, side="left") + 1
+    counts = np.searchsorted(sorted_totals, sorted_totals, side="right") + 1 - first
+    return order, [f"T{p}" if c > 1 else str(p) for p, c in zip(first.tolist(), counts.tolist())]
+
+def round_page(event_name, division, round_num, n_rounds, pars, lengths):
+    lines = [
+        "B-TIER", f"{division} · ROUND {round_num}", event_name, "B-TIER", event_name,
+        "Jun 13-15, 2025  · Synthetic City, Czech Republic",
+        f"LEADERS{division}", "SCORES", "STATS", "COURSE", "CARDS",
+    ]
+    lines += [f"RD {r}" for r in range(1, n_rounds + 1)]
+    lines += [f"ROUND {round_num}", "Synthetic Disc Golf Park ", "Main Layout (Gold)", "#", "Player"]
+    lines += (["Rd ", "Thru"] if round_num == 1 else ["Total", "Rd ", "Thru"])
+    for hole, (length, par) in enumerate(zip(lengths, pars), start=1):
+        lines += [str(hole), str(length), str(par)]
+    lines += ["Tot", f"{sum(lengths)}m", str(sum(pars)), "FAVORITES", "ALL PLAYERS"]
+    return lines
+
+def generate_tournament(n_players=1000, n_rounds=3, pars=None, score_probs=None, dnf_rate=0.01,
+                        cash_line=None, event_name="Synthetic Open", division="MPO", seed=0):
+    rng = np.random.default_rng(seed)
+    pars = np.array(DEFAULT_PARS if pars is None else pars)
+    score_probs = DEFAULT_SCORE_PROBS if score_probs is None else score_probs
+    lengths = (pars * 45 + rng.integers(-20, 40, len(pars))).tolist()
+    if cash_line is None:
+        cash_line = max(1, n_players * 3 // 10)
+
+    names = [
+        f"{FIRST_NAMES[i % len(FIRST_NAMES)]}{LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]}{i}"
+        for i in range(n_players)
+    ]
+    offsets = np.array(list(score_probs.keys()))
+    probs = np.array(list(score_probs.values()), dtype=float)
+    probs /= probs.sum()
+
+    # Stronger players shift their draws toward lower offsets
+    skill = rng.normal(0, 0.35, n_players)
+    draws = rng.choice(len(offsets), size=(n_players, n_rounds, len(pars)), p=probs)
+    draws = np.clip(draws + np.round(skill[:, None, None] * rng.random(draws.shape)).astype(int), 0, len(offsets) - 1)
+    strokes = np.maximum(pars + offsets[draws], 1)
+
+    dnf_round = np.where(rng.random(n_players) < dnf_rate, rng.integers(0, n_rounds, n_players), n_rounds)
+    round_to_par = (strokes - pars).sum(axis=2)
+
+    lines = ["﻿", ""]
+    totals = np.zeros(n_players, dtype=int)
+    previous_positions = None
+    for r in range(n_rounds):
+        is_dnf = dnf_round <= r
+        totals = totals + round_to_par[:, r]
+        ranked = np.where(is_dnf, np.iinfo(np.int32).max, totals)
+        order, places = place_labels(ranked)
+        positions = np.empty(n_players, dtype=int)
+        positions[order] = np.arange(n_players)
+
+        lines += round_page(event_name, division, r + 1, n_rounds, pars.tolist(), lengths)
+        for rank, (i, place) in enumerate(zip(order.tolist(), places)):
+            if rank == cash_line:
+                lines.append(f"CASH LINE - TOP {cash_line}")
+            lines.append(str(n_players) if is_dnf[i] else place)
+            if previous_positions is not None and not is_dnf[i] and previous_positions[i] != positions[i]:
+                lines.append(str(abs(previous_positions[i] - positions[i])))
+            lines += ["", names[i]]
+            if is_dnf[i]:
+                lines += (["DNF"] if r == 0 else ["DNF", "DNF"]) + ["F"] + ["· "] * len(pars) + ["DNF", "·"]
+                continue
+            if r > 0:
+                lines.append(format_to_par(int(totals[i])))
+            rating = int(1000 - 9 * round_to_par[i, r] + rng.integers(-5, 6))
+            lines += [format_to_par(int(round_to_par[i, r])), "F"]
+            lines += [str(score) for score in strokes[i, r].tolist()]
+            lines += [str(int(strokes[i, r].sum())), str(rating)]
+        lines += LEGEND + ["COLOR ACCESSIBILITY", "DARK MODE", "FAVORITES", "",
+                           "© 2025 Professional Disc Golf Association", "", ""]
+        previous_positions = positions
+
+    return lines
+
+def write_tournament(file_path, **kwargs):
+    lines = generate_tournament(**kwargs)
+    with open(file_path, "w", encoding="utf-8", newline="") as f:
+        f.write("\r\n".join(lines))
+    return file_path
+
+
+# %%
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic tournament export.")
+    parser.add_argument("out", help="file to write")
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--dnf-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_tournament(args.out, n_players=args.players, n_rounds=args.rounds, dnf_rate=args.dnf_rate, seed=args.seed)